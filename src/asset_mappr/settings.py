@@ -43,6 +43,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "corsheaders",
     "assets",
@@ -84,6 +85,9 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "asset_mappr.wsgi.application"
+ASGI_APPLICATION = "asset_mappr.asgi.application"
+# "wsgi" for sync workers, "asgi" for uvicorn workers and async views
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi')
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
@@ -117,9 +121,12 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
-# Password hashers
+# Password hashers, new hashes use the first one and others are upgraded
+# to it on login. BCryptPasswordHasher checks hashes from before salt was
+# dropped.
 PASSWORD_HASHERS = [
-    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "user.hashing.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.BCryptPasswordHasher",
     "django.contrib.auth.hashers.PBKDF2PasswordHasher",
     "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
     "django.contrib.auth.hashers.Argon2PasswordHasher",
@@ -128,8 +135,9 @@ PASSWORD_HASHERS = [
 
 # Configure JWT settings
 REST_FRAMEWORK = {
+    # Users are built from the token claims, without any query
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.StatelessJWTAuthentication",
     ],
 }
 
@@ -138,7 +146,21 @@ SIMPLE_JWT = {
         days=1
     ),  # Adjust the token lifetime as per your requirements
     "REFRESH_TOKEN_LIFETIME": timedelta(days=5),
+    "TOKEN_USER_CLASS": "user.authentication.ProfileTokenUser",
 }
+# Tokens each process remembers as verified, and for how many seconds,
+# 0 to verify every request
+JWT_VERIFIED_TOKENS_CACHE_SIZE = int(os.getenv('JWT_VERIFIED_TOKENS_CACHE_SIZE', '4096'))
+JWT_VERIFIED_TOKENS_CACHE_SECONDS = int(os.getenv('JWT_VERIFIED_TOKENS_CACHE_SECONDS', '60'))
+
+# bcrypt cost of new password hashes, others are upgraded on login
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+# Threads each process hashes passwords in, and hashes that may wait for
+# one before requests are turned away with a 503. The limit is per process:
+# a sync WSGI worker has a single request in flight and never reaches it,
+# so it only turns requests away under SERVER_MODE=asgi
+PASSWORD_HASHING_THREADS = int(os.getenv('PASSWORD_HASHING_THREADS', '2'))
+PASSWORD_HASHING_QUEUE = int(os.getenv('PASSWORD_HASHING_QUEUE', '16'))
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
@@ -166,6 +188,51 @@ SWAGGER_SETTINGS = {
     'USE_SESSION_AUTH': True
 }
 
+# Assets API
+# Default and maximum number of assets per page of get_assets
+ASSETS_PAGE_SIZE = int(os.getenv('ASSETS_PAGE_SIZE', '1000'))
+ASSETS_MAX_PAGE_SIZE = int(os.getenv('ASSETS_MAX_PAGE_SIZE', '10000'))
+# Default page size of the assets search
+ASSETS_SEARCH_PAGE_SIZE = int(os.getenv('ASSETS_SEARCH_PAGE_SIZE', '20'))
+# Default and maximum matches per autocomplete request, and communities whose
+# autocomplete index each process keeps in memory
+ASSETS_AUTOCOMPLETE_LIMIT = int(os.getenv('ASSETS_AUTOCOMPLETE_LIMIT', '10'))
+ASSETS_AUTOCOMPLETE_MAX_LIMIT = int(os.getenv('ASSETS_AUTOCOMPLETE_MAX_LIMIT', '50'))
+ASSETS_AUTOCOMPLETE_COMMUNITIES = int(os.getenv('ASSETS_AUTOCOMPLETE_COMMUNITIES', '64'))
+# Least seconds between reloads of the communities each process keeps in
+# memory, when asked for one it doesn't know
+ASSETS_COMMUNITIES_RELOAD_SECONDS = int(os.getenv('ASSETS_COMMUNITIES_RELOAD_SECONDS', '60'))
+# Seconds facet counts stay cached - they are versioned, so never stale
+ASSETS_FACETS_CACHE_TIMEOUT = int(os.getenv('ASSETS_FACETS_CACHE_TIMEOUT', '86400'))
+# Seconds a sync looks back before changed_since, to catch writes committed
+# after a previous sync with timestamps before its watermark
+ASSETS_SYNC_OVERLAP_SECONDS = int(os.getenv('ASSETS_SYNC_OVERLAP_SECONDS', '60'))
+# Most items per batch request
+ASSETS_BATCH_MAX_ITEMS = int(os.getenv('ASSETS_BATCH_MAX_ITEMS', '1000'))
+# Seconds compressed whole community listings stay cached
+ASSETS_PAYLOAD_CACHE_TIMEOUT = int(os.getenv('ASSETS_PAYLOAD_CACHE_TIMEOUT', '86400'))
+# Seconds a request may rebuild a changed listing before another one takes
+# over, and seconds requests with no previous listing wait for it
+ASSETS_PAYLOAD_LOCK_SECONDS = int(os.getenv('ASSETS_PAYLOAD_LOCK_SECONDS', '30'))
+ASSETS_PAYLOAD_WAIT_SECONDS = int(os.getenv('ASSETS_PAYLOAD_WAIT_SECONDS', '10'))
+# Directory of the static community listings nginx serves, empty to
+# publish none
+ASSETS_SNAPSHOT_DIR = os.getenv('ASSETS_SNAPSHOT_DIR', '')
+# Rows fetched per server-side cursor round trip when streaming get_assets
+ASSETS_STREAM_CHUNK_SIZE = int(os.getenv('ASSETS_STREAM_CHUNK_SIZE', '2000'))
+# Largest near= radius, and most grid cell ranges per bbox= query
+ASSETS_MAX_RADIUS_M = int(os.getenv('ASSETS_MAX_RADIUS_M', '100000'))
+ASSETS_MAX_CELL_RANGES = int(os.getenv('ASSETS_MAX_CELL_RANGES', '64'))
+
+# Cache shared by all workers when REDIS_URL is set, per process otherwise
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv('REDIS_URL'),
+        }
+    }
+
 # Logging Configuration
 
 # Clear prev config
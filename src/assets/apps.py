@@ -17,3 +17,7 @@ class AssetsConfig(AppConfig):
     """
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'assets'
+
+    def ready(self):
+        """Connect signal receivers"""
+        from . import signals  # pylint: disable=import-outside-toplevel,unused-import
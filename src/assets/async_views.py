@@ -0,0 +1,178 @@
+"""
+This module defines the async views served in ASGI mode.
+
+They answer like their sync counterparts, but wait for the database,
+password hashing and other requests' rebuilds without holding a worker,
+so an ASGI worker serves many requests at once.
+
+Author: Shashank Shekhar
+"""
+
+import inspect
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control, \
+    patch_vary_headers
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .compression import CompressedPayload
+from .models import CommunityVersions
+from .serializer import FastAssetSerializer
+from .streaming import async_streaming_json_response
+from .views import AssetsView, etag_community, payload_encoding, version_etag
+
+
+class AsyncAPIView(APIView):
+    """
+    API view with async handlers.
+
+    Authentication, permissions and throttling run in a thread as they may
+    query the database; handlers are awaited. Exception handling and
+    finalizing, which may compress and cache a payload, run in a thread too.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):  # pylint: disable=invalid-overridden-method
+        """
+        Dispatch a request to its async handler.
+
+        Parameters:
+            request(HttpRequest): User requests.
+        Returns:
+            response(HttpResponse): Reponse.
+        """
+        # pylint: disable=attribute-defined-outside-init
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(),
+                                  self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            if not inspect.iscoroutinefunction(handler):
+                handler = sync_to_async(handler)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:  # pylint: disable=broad-except
+            response = await sync_to_async(self.handle_exception,
+                                           thread_sensitive=False)(exc)
+
+        self.response = await sync_to_async(self.finalize_response,
+                                            thread_sensitive=False)(
+            request, response, *args, **kwargs)
+        return self.response
+
+
+def serialize(serializer_class, rows, options):
+    """Serialized data of rows, the columnar format reads lookup tables"""
+    return serializer_class(rows, many=True, **options).data
+
+
+class AsyncAssetsView(AsyncAPIView, AssetsView):
+    """
+    Async asset views, see AssetsView.
+
+    Methods:
+        get(request): Defines the GET method to get all available assets.
+        post(request): Defines the POST method to create a new asset.
+    """
+
+    async def get(self, request):  # pylint: disable=invalid-overridden-method
+        """
+        Get list of assets
+
+        Same as AssetsView.get, with the async ORM.
+
+        Parameters:
+            request(HttpRequest): User requests.
+        Returns:
+            response(HttpResponse): Reponse.
+        """
+        etag = None
+        community_geo_id = etag_community(request)
+        if community_geo_id is not None:
+            version = await CommunityVersions.objects.acurrent(community_geo_id)
+            etag = version_etag(request, version)
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = await self.list_assets(request)
+        if etag and not response.has_header("ETag"):
+            response["ETag"] = etag
+        patch_cache_control(response, no_cache=True)
+        patch_vary_headers(response, ("Accept", "Accept-Encoding"))
+        return response
+
+    async def list_assets(self, request):
+        """
+        List the assets of a request.
+
+        Parameters:
+            request(HttpRequest): User requests.
+        Returns:
+            response(HttpResponse): Reponse.
+        """
+        serializer_class, options, rows = self.listing(request)
+
+        if request.query_params.get('stream') == 'true' \
+                and serializer_class is FastAssetSerializer:
+            serializer = serializer_class(**options)
+            return async_streaming_json_response(rows,
+                                                 serializer.to_representation,
+                                                 settings.ASSETS_STREAM_CHUNK_SIZE)
+
+        if request.query_params.get('paginate') == 'false':
+            response = await self.cached_listing(request)
+            if response is not None:
+                return response
+            rows = [row async for row in rows]
+            data = await sync_to_async(serialize)(serializer_class, rows, options)
+            return Response(data, status=status.HTTP_200_OK)
+
+        paginator = self.pagination_class()
+        page = await sync_to_async(paginator.paginate_queryset)(rows, request, view=self)
+        data = await sync_to_async(serialize)(serializer_class, page, options)
+        return paginator.get_paginated_response(data)
+
+    async def cached_listing(self, request):
+        """
+        Cached compressed payload of a whole community listing.
+
+        Parameters:
+            request(HttpRequest): User requests with paginate=false.
+        Returns:
+            response(HttpResponse): Cached payload, None to build it.
+        """
+        encoding = payload_encoding(request)
+        if not encoding:
+            return None
+        payload = await sync_to_async(CompressedPayload)(request, encoding)
+        if not payload.key:
+            return None
+        # Waiting for another request's rebuild holds a thread, not the loop
+        response = await sync_to_async(payload.cached_response,
+                                       thread_sensitive=False)()
+        if response is None:
+            self.payload = payload
+        return response
+
+    @staticmethod
+    async def post(request):  # pylint: disable=invalid-overridden-method
+        """
+        Add an asset
+
+        Adds an asset to list of available assets
+
+        Parameters:
+            request(HttpRequest): User requests.
+        Returns:
+            response(HttpResponse): Reponse.
+        """
+        return await sync_to_async(AssetsView.post)(request)
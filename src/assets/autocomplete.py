@@ -0,0 +1,257 @@
+"""
+This module implements search-as-you-type over asset names and addresses.
+
+Each process keeps an in-memory prefix index of the valid assets of the
+most recently used communities. An index is rebuilt when the data version
+of its community changes, so writes are picked up on the next keystroke
+without querying assets for every one of them.
+
+Author: Shashank Shekhar
+"""
+
+import heapq
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .models import Assets, CommunityVersions
+
+WORD_RE = re.compile(r"\w+")
+# Sorts after every word starting with the same prefix
+LAST_CHAR = chr(0x10FFFF)
+# Matches in names rank above matches in addresses
+NAME_WEIGHT = 2
+ADDRESS_WEIGHT = 1
+# Exact words rank above completed prefixes, and those above typos
+EXACT_SCORE = 3
+PREFIX_SCORE = 2
+TYPO_SCORE = 1
+
+
+def tokenize(text):
+    """
+    Split text into case and accent insensitive words.
+
+    Parameters:
+        text(string): Text.
+    Returns:
+        words(list): Normalized words.
+    """
+    text = text or ""
+    if not text.isascii():
+        text = "".join(char for char in unicodedata.normalize("NFKD", text)
+                       if not unicodedata.combining(char))
+    return WORD_RE.findall(text.casefold())
+
+
+def max_typos(word):
+    """Edit distance tolerated for a word - none for the shortest ones"""
+    if len(word) < 3:
+        return 0
+    if len(word) < 7:
+        return 1
+    return 2
+
+
+def next_row(row, word, char):
+    """
+    Extend Levenshtein distances of word prefixes by one token character.
+
+    Parameters:
+        row(list): Distances from each prefix of word to a token prefix.
+        word(string): Typed word.
+        char(string): Next token character.
+    Returns:
+        row(list): Distances to the token prefix extended by char.
+    """
+    extended = [row[0] + 1]
+    for i, word_char in enumerate(word, 1):
+        extended.append(min(row[i] + 1,
+                            extended[i - 1] + 1,
+                            row[i - 1] + (word_char != char)))
+    return extended
+
+
+class PrefixIndex:
+    """
+    Prefix index of the assets of one community.
+
+    Attributes:
+        version (int): Community data version the index was built from.
+        assets (list): (id, name, address) of the indexed assets.
+        postings (dict): Weight by asset position, by word.
+        vocabulary (list): Sorted indexed words.
+    """
+
+    def __init__(self, version, rows):
+        self.version = version
+        self.assets = list(rows)
+        self.postings = {}
+        for position, (_, name, address) in enumerate(self.assets):
+            for weight, text in ((NAME_WEIGHT, name), (ADDRESS_WEIGHT, address)):
+                for token in tokenize(text):
+                    self.postings.setdefault(token, {}).setdefault(position, weight)
+        self.vocabulary = sorted(self.postings)
+
+    def completions(self, prefix):
+        """Indexed words starting with a prefix"""
+        start = bisect_left(self.vocabulary, prefix)
+        end = bisect_left(self.vocabulary, prefix + LAST_CHAR, start)
+        return self.vocabulary[start:end]
+
+    def typo_completions(self, word, limit):
+        """
+        Indexed words starting a few typos away from a word.
+
+        Walks the sorted vocabulary as a trie. Levenshtein rows are shared
+        by words with a common prefix, and a prefix too far from every
+        prefix of the word is skipped with all the words starting with it.
+
+        Parameters:
+            word(string): Typed word.
+            limit(int): Maximum edit distance.
+        Returns:
+            tokens(list): Words starting with the same letter as word and
+                some prefix of which is at most limit edits from it.
+        """
+        vocabulary = self.vocabulary
+        tokens = []
+        # rows[d] holds the distances of the token prefix of length d
+        rows = [list(range(len(word) + 1))]
+        previous = ""
+        position = bisect_left(vocabulary, word[0])
+        while position < len(vocabulary) and vocabulary[position][0] == word[0]:
+            token = vocabulary[position]
+            common = 0
+            for char, previous_char in zip(token, previous):
+                if char != previous_char or common + 1 >= len(rows):
+                    break
+                common += 1
+            del rows[common + 1:]
+            previous = token
+
+            skip = None
+            for depth in range(common + 1, len(token) + 1):
+                rows.append(next_row(rows[-1], word, token[depth - 1]))
+                if rows[-1][-1] <= limit:
+                    # Every word starting with this prefix matches
+                    skip = token[:depth]
+                    tokens.extend(self.completions(skip))
+                    break
+                if min(rows[-1]) > limit:
+                    # No word starting with this prefix can match
+                    skip = token[:depth]
+                    break
+            if skip is None:
+                position += 1
+            else:
+                position = bisect_left(vocabulary, skip + LAST_CHAR, position)
+        return tokens
+
+    def word_matches(self, word):
+        """
+        Indexed words matching one typed word.
+
+        Words starting with the typed one match. If none does, words
+        starting with the same letter and a few typos away match instead.
+
+        Parameters:
+            word(string): Normalized typed word.
+        Returns:
+            matches(list): (word, score) pairs.
+        """
+        matches = [(token, EXACT_SCORE if token == word else PREFIX_SCORE)
+                   for token in self.completions(word)]
+        limit = max_typos(word)
+        if not matches and limit:
+            matches = [(token, TYPO_SCORE)
+                       for token in self.typo_completions(word, limit)]
+        return matches
+
+    def search(self, text, limit):
+        """
+        Top matches of a typed text.
+
+        Every typed word must match a word of the asset name or address.
+
+        Parameters:
+            text(string): Typed text.
+            limit(int): Maximum number of matches.
+        Returns:
+            matches(list): (id, name, address) of the best matches first.
+        """
+        words = [self.word_matches(word) for word in tokenize(text)]
+        if not words:
+            return []
+        # Start from the most selective word, the others only narrow it down
+        words.sort(key=lambda matches: sum(len(self.postings[token])
+                                           for token, _ in matches))
+        scores = {}
+        for token, score in words[0]:
+            for position, weight in self.postings[token].items():
+                scores[position] = max(scores.get(position, 0), score * weight)
+        for matches in words[1:]:
+            narrowed = {}
+            for position, total in scores.items():
+                best = max((score * self.postings[token].get(position, 0)
+                            for token, score in matches), default=0)
+                if best:
+                    narrowed[position] = total + best
+            scores = narrowed
+
+        # Best score first, then shorter and alphabetically first names
+        best = heapq.nsmallest(
+            limit, scores,
+            key=lambda position: (-scores[position],
+                                  len(self.assets[position][1]),
+                                  self.assets[position][1]))
+        return [self.assets[position] for position in best]
+
+
+class PrefixIndexCache:
+    """
+    Least recently used prefix indexes of communities.
+
+    Attributes:
+        size (int): Maximum number of cached communities.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.indexes = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, community_geo_id):
+        """
+        Prefix index of a community, rebuilt if its assets changed.
+
+        Parameters:
+            community_geo_id(int): Community geo ID.
+        Returns:
+            index(PrefixIndex): Index of the valid assets of the community.
+        """
+        # Read before the assets, a concurrent write then only causes a rebuild
+        version = CommunityVersions.objects.current(community_geo_id)
+        with self.lock:
+            index = self.indexes.get(community_geo_id)
+            if index is not None and index.version == version:
+                self.indexes.move_to_end(community_geo_id)
+                return index
+
+        rows = Assets.objects.filter(status__exact=0,
+                                     community_geo_id__exact=community_geo_id) \
+            .values_list("id", "name", "address")
+        index = PrefixIndex(version, rows)
+        with self.lock:
+            self.indexes[community_geo_id] = index
+            self.indexes.move_to_end(community_geo_id)
+            while len(self.indexes) > self.size:
+                self.indexes.popitem(last=False)
+        return index
+
+
+prefix_indexes = PrefixIndexCache(settings.ASSETS_AUTOCOMPLETE_COMMUNITIES)
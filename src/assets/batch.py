@@ -0,0 +1,175 @@
+"""
+This module writes batches of offline collected asset data.
+
+Author: Shashank Shekhar
+"""
+
+from django.db import transaction
+
+from .models import AssetRatingSummaries, AssetRatings, AssetUpdates, Assets, \
+    Categories, Communities, RatingValues, Sources
+from .serializer import BatchAssetRatingSerializer, BatchAssetSerializer, \
+    BatchAssetUpdateSerializer
+from .signals import notify_assets_changed
+
+SUGGESTION = 2
+UNDER_REVIEW = 1
+SERIALIZERS = {
+    "asset": BatchAssetSerializer,
+    "update": BatchAssetUpdateSerializer,
+    "rating": BatchAssetRatingSerializer,
+}
+# Model referenced by each ID field of the items
+REFERENCES = {
+    "community_id": Communities,
+    "source_id": Sources,
+    "category_id": Categories,
+    "asset_id": Assets,
+    "value_id": RatingValues,
+}
+
+
+def invalid(kind, errors):
+    """Result of an item that was not written"""
+    return {"kind": kind, "status": "invalid", "errors": errors}
+
+
+def validate_items(items):
+    """
+    Validate the fields of each item, without querying the database.
+
+    Parameters:
+        items(list): {"kind": ..., "data": {...}} items.
+    Returns:
+        valid(dict): Validated data by item index.
+        results(list): Result of each invalid item, None for valid ones.
+    """
+    valid, results = {}, [None] * len(items)
+    for index, item in enumerate(items):
+        kind = item.get("kind")
+        if kind not in SERIALIZERS:
+            results[index] = invalid(kind, {"kind": [f"Expected one of {', '.join(SERIALIZERS)}."]})
+            continue
+        serializer = SERIALIZERS[kind](data=item.get("data"))
+        if serializer.is_valid():
+            valid[index] = serializer.validated_data
+        else:
+            results[index] = invalid(kind, serializer.errors)
+    return valid, results
+
+
+def fetch_references(valid):
+    """
+    Fetch the rows referenced by valid items, one query per table.
+
+    Parameters:
+        valid(dict): Validated data by item index.
+    Returns:
+        references(dict): Referenced rows by ID, by ID field. Assets are
+            their community geo ID, communities (geo_id, name).
+    """
+    ids = {field: set() for field in REFERENCES}
+    for data in valid.values():
+        for field in REFERENCES:
+            if data.get(field) is not None:
+                ids[field].add(data[field])
+    references = {}
+    for field, model in REFERENCES.items():
+        rows = model.objects.filter(pk__in=ids[field])
+        if model is Communities:
+            rows = rows.values_list("pk", "geo_id", "name")
+            references[field] = {pk: (geo_id, name) for pk, geo_id, name in rows}
+        elif model is Assets:
+            references[field] = dict(rows.values_list("pk", "community_geo_id"))
+        else:
+            references[field] = dict.fromkeys(rows.values_list("pk", flat=True))
+    return references
+
+
+def apply_batch(items, user_id):
+    """
+    Validate a batch of suggested assets, asset updates and ratings, and
+    write the valid ones in one transaction.
+
+    Every item is validated, references in bulk. Items are created with
+    one bulk insert per kind: assets as suggestions, updates under review.
+    Updates and ratings may reference an asset suggested by an earlier
+    item of the batch with asset_ref, its index. Assets and ratings are
+    written as the given user.
+
+    Parameters:
+        items(list): {"kind": "asset" | "update" | "rating", "data": {...}}.
+        user_id(int): ID of the authenticated user.
+    Returns:
+        results(list): Per item {"kind", "status": "created", "id"} or
+            {"kind", "status": "invalid", "errors"}, in item order.
+    """
+    valid, results = validate_items(items)
+    references = fetch_references(valid)
+    for index, data in list(valid.items()):
+        kind = items[index]["kind"]
+        errors = {field: ["Not found."] for field in REFERENCES
+                  if data.get(field) is not None and data[field] not in references[field]}
+        ref = data.get("asset_ref")
+        if ref is not None and (ref >= index or ref not in valid or
+                                items[ref]["kind"] != "asset"):
+            errors["asset_ref"] = ["Expected the index of a valid earlier asset item."]
+        if errors:
+            del valid[index]
+            results[index] = invalid(kind, errors)
+
+    by_kind = {kind: [(index, valid[index]) for index in sorted(valid)
+                      if items[index]["kind"] == kind]
+               for kind in SERIALIZERS}
+    created = write_items(by_kind, references, user_id)
+    for index, row in created.items():
+        results[index] = {"kind": items[index]["kind"], "status": "created", "id": row.pk}
+    return results
+
+
+def write_items(by_kind, references, user_id):
+    """
+    Insert valid items in one transaction, one bulk insert per kind.
+
+    Parameters:
+        by_kind(dict): (index, validated data) of the valid items, by kind.
+        references(dict): Referenced rows, see fetch_references().
+        user_id(int): ID of the user writing the batch.
+    Returns:
+        created(dict): Created row by item index.
+    """
+    with transaction.atomic():
+        communities = references["community_id"]
+        assets = Assets.objects.bulk_create([
+            Assets(**data,
+                   user_id=user_id,
+                   community_geo_id=communities[data["community_id"]][0],
+                   community_name=communities[data["community_id"]][1],
+                   status=SUGGESTION)
+            for _, data in by_kind["asset"]])
+        created = {index: asset for (index, _), asset in zip(by_kind["asset"], assets)}
+
+        def resolved(data):
+            """Fields of an item about an asset, with asset_ref resolved"""
+            fields = dict(data)
+            if "asset_ref" in fields:
+                fields["asset_id"] = created[fields.pop("asset_ref")].pk
+            return fields
+
+        updates = AssetUpdates.objects.bulk_create([
+            AssetUpdates(**resolved(data), status=UNDER_REVIEW)
+            for _, data in by_kind["update"]])
+        created.update((index, update) for (index, _), update in zip(by_kind["update"], updates))
+        ratings = AssetRatings.objects.bulk_create([
+            AssetRatings(**resolved(data), user_id=user_id) for _, data in by_kind["rating"]])
+        created.update((index, rating) for (index, _), rating in zip(by_kind["rating"], ratings))
+
+        # Bulk inserts bypass the model signals
+        AssetRatingSummaries.objects.apply_changes(
+            (rating.asset_id, rating.value_id, 1, rating.timestamp) for rating in ratings)
+        community_geo_ids = {asset.community_geo_id for asset in assets}
+        community_geo_ids.update(references["asset_id"][data["asset_id"]]
+                                 for _, data in by_kind["rating"] if "asset_id" in data)
+        if community_geo_ids:
+            notify_assets_changed(community_geo_ids)
+    return created
@@ -0,0 +1,88 @@
+"""
+This module maps community geo IDs to their primary keys in memory.
+
+Communities are loaded from the census and hardly ever change, so each
+process keeps all of them and rows referencing a community are written
+without looking it up. An unknown geo ID reloads them, at most once per
+ASSETS_COMMUNITIES_RELOAD_SECONDS so invalid IDs can't flood the database.
+
+Author: Shashank Shekhar
+"""
+
+import time
+
+from django.conf import settings
+
+from .models import Communities
+
+
+class CommunityIdCache:
+    """
+    Primary keys of all communities by geo ID.
+
+    The mapping is replaced as a whole, never modified, so readers need
+    no lock.
+
+    Attributes:
+        reload_seconds (int): Least seconds between reloads.
+        ids (dict): Community ID by geo ID.
+        loaded (float): Monotonic time of the last load, None to reload
+            on the next miss.
+    """
+
+    def __init__(self, reload_seconds):
+        self.reload_seconds = reload_seconds
+        self.ids = {}
+        self.loaded = None
+
+    def get(self, community_geo_id):
+        """
+        Primary key of a community.
+
+        Parameters:
+            community_geo_id(int): Community geo ID.
+        Returns:
+            community_id(int): Community ID, None if there is no such
+                community.
+        """
+        community_id = self.ids.get(community_geo_id)
+        if community_id is None and self.expired():
+            self.store(dict(Communities.objects.values_list("geo_id", "id")))
+            community_id = self.ids.get(community_geo_id)
+        return community_id
+
+    async def aget(self, community_geo_id):
+        """
+        Primary key of a community, with the async ORM.
+
+        Parameters:
+            community_geo_id(int): Community geo ID.
+        Returns:
+            community_id(int): Community ID, None if there is no such
+                community.
+        """
+        community_id = self.ids.get(community_geo_id)
+        if community_id is None and self.expired():
+            self.store({geo_id: pk async for geo_id, pk in
+                        Communities.objects.values_list("geo_id", "id")})
+            community_id = self.ids.get(community_geo_id)
+        return community_id
+
+    def expired(self):
+        """Check if a miss may reload the communities"""
+        return self.loaded is None or \
+            time.monotonic() - self.loaded >= self.reload_seconds
+
+    def store(self, ids):
+        """Replace the cached communities"""
+        self.ids = ids
+        self.loaded = time.monotonic()
+
+    def forget(self, community_geo_id):
+        """Drop a community that turned out to be deleted, and reload"""
+        self.ids = {geo_id: pk for geo_id, pk in self.ids.items()
+                    if geo_id != community_geo_id}
+        self.loaded = None
+
+
+community_ids = CommunityIdCache(settings.ASSETS_COMMUNITIES_RELOAD_SECONDS)
@@ -0,0 +1,219 @@
+"""
+This module serves precompressed asset listings.
+
+Whole community listings are the largest and most requested responses.
+They are compressed once per data version of their community, and the
+compressed bytes are cached and served as is until the community changes.
+A changed listing is then rebuilt by one request, while the others keep
+getting the previous one.
+
+Author: Shashank Shekhar
+"""
+
+import gzip
+import hashlib
+import threading
+import time
+
+import brotli
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from .models import CommunityVersions
+
+# Payloads are compressed once per version, so favour ratio over speed
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+# Seconds between checks for a payload rebuilt by another worker
+POLL_SECONDS = 0.05
+# Supported encodings, preferred first
+ENCODINGS = {
+    "br": lambda content: brotli.compress(content, quality=BROTLI_QUALITY),
+    "gzip": lambda content: gzip.compress(content, compresslevel=GZIP_LEVEL,
+                                          mtime=0),
+}
+
+
+def negotiate_encoding(request):
+    """
+    Pick the content encoding of a response from Accept-Encoding.
+
+    Parameters:
+        request(HttpRequest): User requests.
+    Returns:
+        encoding(string): Supported encoding, None to send identity.
+    """
+    qualities = {}
+    for coding in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+        name, _, params = coding.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressedPayload:
+    """
+    Cached compressed payload of a whole community listing.
+
+    Payloads are cached with the data version they were built from. When
+    the version changes, a single request rebuilds the payload - one per
+    process through an event, one across workers through a lock in the
+    shared cache. Meanwhile other requests get the previous payload, or
+    wait for the new one if there is none.
+
+    Attributes:
+        encoding (string): Content encoding.
+        version (int): Current data version of the community.
+        key (string): Cache key of the request variant, None if the
+            community is invalid.
+        flight (Event): Set once the payload this process waits for is
+            rebuilt.
+        leader (bool): True if this request rebuilds for its process.
+        locked (bool): True if this request holds the rebuild lock.
+    """
+
+    def __init__(self, request, encoding):
+        self.encoding = encoding
+        self.version = None
+        self.key = None
+        self.flight = None
+        self.leader = False
+        self.locked = False
+        try:
+            community_geo_id = int(request.query_params['com_geo_id'])
+        except ValueError:
+            return
+        self.version = CommunityVersions.objects.current(community_geo_id)
+        variant = f"{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}"
+        digest = hashlib.sha1(variant.encode()).hexdigest()
+        self.key = f"asset_payload:{community_geo_id}:{digest}:{encoding}"
+
+    def is_current(self, entry):
+        """Check if a cache entry was built from the current version"""
+        return entry is not None and entry[0] == self.version
+
+    def cached_response(self):
+        """
+        Response of the cached payload, waiting for a rebuild if needed.
+
+        Returns:
+            response(HttpResponse): Current or previous compressed
+                payload, None if this request must build it.
+        """
+        entry = cache.get(self.key)
+        if self.is_current(entry):
+            return self.response(entry)
+        if self.lead():
+            return None
+        if entry is None:
+            entry = self.wait()
+        self.land()
+        return self.response(entry) if entry is not None else None
+
+    def lead(self):
+        """
+        Try to become the request rebuilding the payload.
+
+        Returns:
+            locked(bool): True if this request holds the rebuild lock.
+        """
+        with flights_lock:
+            self.flight = flights.get(self.key)
+            if self.flight is None:
+                self.leader = True
+                self.flight = flights[self.key] = threading.Event()
+        if self.leader:
+            self.locked = cache.add(f"{self.key}:lock", True,
+                                    timeout=settings.ASSETS_PAYLOAD_LOCK_SECONDS)
+        return self.locked
+
+    def wait(self):
+        """
+        Wait for the payload another request rebuilds.
+
+        Returns:
+            entry(tuple): Current cache entry, None if not rebuilt in time.
+        """
+        timeout = settings.ASSETS_PAYLOAD_WAIT_SECONDS
+        if not self.leader:
+            # The leader of this process waits for or rebuilds it
+            self.flight.wait(timeout)
+            entry = cache.get(self.key)
+            return entry if self.is_current(entry) else None
+
+        # Another worker holds the lock
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            time.sleep(POLL_SECONDS)
+            entry = cache.get(self.key)
+            if self.is_current(entry):
+                return entry
+        return None
+
+    def land(self):
+        """Release the rebuild lock and wake up the requests waiting"""
+        if self.locked:
+            cache.delete(f"{self.key}:lock")
+            self.locked = False
+        if self.leader:
+            with flights_lock:
+                flights.pop(self.key, None)
+            self.flight.set()
+            self.leader = False
+
+    def response(self, entry):
+        """
+        Response of a cache entry.
+
+        Parameters:
+            entry(tuple): (version, ETag, content, content type).
+        Returns:
+            response(HttpResponse): Compressed response.
+        """
+        _, etag, content, content_type = entry
+        response = HttpResponse(content, content_type=content_type)
+        response["Content-Encoding"] = self.encoding
+        response["Content-Length"] = str(len(content))
+        # A previous payload keeps its ETag, it's not the current version
+        if etag:
+            response["ETag"] = etag
+        return response
+
+    def store(self, response):
+        """
+        Compress a rendered response in place, cache it and land.
+
+        Parameters:
+            response(Response): Response of the request.
+        """
+        try:
+            if response.status_code == 200:
+                response.render()
+                content = ENCODINGS[self.encoding](response.content)
+                cache.set(self.key, (self.version, response.get("ETag"), content,
+                                     response["Content-Type"]),
+                          timeout=settings.ASSETS_PAYLOAD_CACHE_TIMEOUT)
+                response.content = content
+                response["Content-Encoding"] = self.encoding
+                response["Content-Length"] = str(len(content))
+        finally:
+            self.land()
+
+
+# Events of the payloads rebuilt by this process, by cache key
+flights = {}
+flights_lock = threading.Lock()
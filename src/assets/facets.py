@@ -0,0 +1,78 @@
+"""
+This module counts assets by facet for dashboards.
+
+Counts of a community are cached under its data version, so cached counts
+are never stale and a dashboard load only reads the versions.
+
+Author: Shashank Shekhar
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Assets, CommunityVersions
+
+# Facet name by counted field
+FACETS = {
+    "category_id": "category",
+    "source_id": "source",
+    "type": "type",
+    "status": "status",
+}
+
+
+def count_facets(community_geo_ids):
+    """
+    Count the assets of communities by facet in a single grouped query.
+
+    Parameters:
+        community_geo_ids(list): Community geo IDs.
+    Returns:
+        facets(dict): Facet counts by geo ID, see empty_facets().
+    """
+    facets = {community_geo_id: empty_facets()
+              for community_geo_id in community_geo_ids}
+    groups = Assets.objects.filter(community_geo_id__in=community_geo_ids) \
+        .values_list("community_geo_id", *FACETS) \
+        .annotate(count=Count("id")) \
+        .order_by()
+    for community_geo_id, *values, count in groups:
+        community = facets[community_geo_id]
+        community["total"] += count
+        for facet, value in zip(FACETS.values(), values):
+            counts = community[facet]
+            counts[value] = counts.get(value, 0) + count
+    return facets
+
+
+def empty_facets():
+    """Facet counts of a community without assets"""
+    return {"total": 0, **{facet: {} for facet in FACETS.values()}}
+
+
+def cached_facets(community_geo_ids):
+    """
+    Facet counts of communities, counting only those not cached yet.
+
+    Parameters:
+        community_geo_ids(list): Community geo IDs.
+    Returns:
+        facets(dict): Facet counts by geo ID.
+    """
+    versions = CommunityVersions.objects.current_many(community_geo_ids)
+    keys = {f"asset_facets:{community_geo_id}:{version}": community_geo_id
+            for community_geo_id, version in versions.items()}
+    cached = cache.get_many(keys)
+    facets = {keys[key]: value for key, value in cached.items()}
+
+    missing = [community_geo_id for key, community_geo_id in keys.items()
+               if key not in cached]
+    if missing:
+        counted = count_facets(missing)
+        cache.set_many({key: counted[community_geo_id]
+                        for key, community_geo_id in keys.items()
+                        if community_geo_id in counted},
+                       timeout=settings.ASSETS_FACETS_CACHE_TIMEOUT)
+        facets.update(counted)
+    return facets
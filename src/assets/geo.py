@@ -0,0 +1,245 @@
+"""
+This module maps coordinates to grid cells for spatial queries.
+
+The world is split into square cells of 360 / 2 ** zoom degrees. A cell is
+identified by row * 2 ** zoom + column, rows counted from the south pole and
+columns from the antimeridian, so the cells of one row form a contiguous
+range of IDs.
+
+Author: Shashank Shekhar
+"""
+
+import math
+from collections import namedtuple
+from decimal import Decimal
+
+from django.db import models
+from django.db.models import F, Q, Value
+from django.db.models.functions import ASin, Cast, Cos, Floor, Least, Power, \
+    Radians, Sin, Sqrt
+
+# Cells of about 1.2 km, used by the assets spatial index
+GEO_CELL_ZOOM = 15
+# Cells of about 78 km, used by the coarse assets spatial index for boxes
+# spanning too many rows of fine cells
+COARSE_GEO_CELL_ZOOM = 9
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+
+BoundingBox = namedtuple("BoundingBox",
+                         ["min_lng", "min_lat", "max_lng", "max_lat"])
+
+
+def cell_size(zoom):
+    """Cell size in degrees at a zoom level - exact in binary and decimal"""
+    return Decimal(360) / (1 << zoom)
+
+
+def geo_cell(zoom=GEO_CELL_ZOOM, latitude="latitude", longitude="longitude"):
+    """
+    Database expression of the cell containing a row's coordinates.
+
+    Parameters:
+        zoom(int): Zoom level of the grid.
+        latitude(string): Latitude field.
+        longitude(string): Longitude field.
+    Returns:
+        expression(Expression): Cell ID as a bigint.
+    """
+    size = Value(cell_size(zoom))
+    row = Floor((F(latitude) + Value(90)) / size)
+    column = Floor((F(longitude) + Value(180)) / size)
+    return Cast(row * Value(1 << zoom) + column, models.BigIntegerField())
+
+
+def cell_of(latitude, longitude, zoom=GEO_CELL_ZOOM):
+    """
+    Cell containing a point, as computed by geo_cell().
+
+    Parameters:
+        latitude(Decimal): Latitude.
+        longitude(Decimal): Longitude.
+        zoom(int): Zoom level of the grid.
+    Returns:
+        cell(int): Cell ID.
+    """
+    size = cell_size(zoom)
+    row = math.floor((Decimal(latitude) + 90) / size)
+    column = math.floor((Decimal(longitude) + 180) / size)
+    return row * (1 << zoom) + column
+
+
+def cell_ranges(bbox, zoom=GEO_CELL_ZOOM, max_ranges=64):
+    """
+    Ranges of cell IDs covering a bounding box.
+
+    Each row of cells is one range. Past max_ranges rows a single range from
+    the first to the last cell is used instead, a superset of the box.
+
+    Parameters:
+        bbox(BoundingBox): Box not crossing the antimeridian.
+        zoom(int): Zoom level of the grid.
+        max_ranges(int): Maximum number of ranges.
+    Returns:
+        ranges(list): Inclusive (first, last) cell ID pairs.
+    """
+    size = float(cell_size(zoom))
+    width = 1 << zoom
+    first_row, last_row = cell_rows(bbox, zoom)
+    first_column = max(math.floor((bbox.min_lng + 180) / size) - 1, 0)
+    last_column = min(math.floor((bbox.max_lng + 180) / size) + 1, width)
+    if last_row - first_row + 1 > max_ranges:
+        return [(first_row * width + first_column,
+                 last_row * width + last_column)]
+    return [(row * width + first_column, row * width + last_column)
+            for row in range(first_row, last_row + 1)]
+
+
+def cell_rows(bbox, zoom=GEO_CELL_ZOOM):
+    """
+    Rows of cells covering a bounding box.
+
+    Parameters:
+        bbox(BoundingBox): Box.
+        zoom(int): Zoom level of the grid.
+    Returns:
+        rows(tuple): Inclusive first and last rows.
+    """
+    size = float(cell_size(zoom))
+    # One extra cell on each side absorbs float rounding at cell edges
+    return (max(math.floor((bbox.min_lat + 90) / size) - 1, 0),
+            math.floor((bbox.max_lat + 90) / size) + 1)
+
+
+def split_antimeridian(bbox):
+    """Split a box crossing the antimeridian (min_lng > max_lng) in two"""
+    if bbox.min_lng <= bbox.max_lng:
+        return [bbox]
+    return [bbox._replace(max_lng=180.0), bbox._replace(min_lng=-180.0)]
+
+
+def bbox_filter(bbox, field="geo_cell", zoom=GEO_CELL_ZOOM, max_ranges=64):
+    """
+    Filter on the cells covering a bounding box.
+
+    Parameters:
+        bbox(BoundingBox): Box, may cross the antimeridian.
+        field(string): Field or alias holding the cell ID.
+        zoom(int): Zoom level of the grid.
+        max_ranges(int): Maximum number of ranges per box.
+    Returns:
+        filter(Q): Cell ID conditions.
+    """
+    condition = Q()
+    for box in split_antimeridian(bbox):
+        for first, last in cell_ranges(box, zoom, max_ranges):
+            condition |= Q(**{f"{field}__range": (first, last)})
+    return condition
+
+
+def indexed_bbox_filter(bbox, max_ranges=64):
+    """
+    Filter on the assets spatial index fitting a bounding box.
+
+    The geo_cell index serves boxes up to max_ranges rows of fine cells
+    tall, about 0.7 degrees of latitude by default. Taller boxes use the
+    coarse_geo_cell index, so a county or state sized box scans the cells
+    it covers rather than a band of every longitude.
+
+    Parameters:
+        bbox(BoundingBox): Box, may cross the antimeridian.
+        max_ranges(int): Maximum number of ranges per box.
+    Returns:
+        filter(Q): Cell ID conditions on geo_cell or coarse_geo_cell.
+    """
+    first_row, last_row = cell_rows(bbox)
+    if last_row - first_row + 1 <= max_ranges:
+        return bbox_filter(bbox, "geo_cell", GEO_CELL_ZOOM, max_ranges)
+    return bbox_filter(bbox, "coarse_geo_cell", COARSE_GEO_CELL_ZOOM, max_ranges)
+
+
+def coordinates_filter(bbox):
+    """
+    Exact filter on the coordinates inside a bounding box.
+
+    Parameters:
+        bbox(BoundingBox): Box, may cross the antimeridian.
+    Returns:
+        filter(Q): Latitude and longitude conditions.
+    """
+    condition = Q(latitude__gte=bbox.min_lat, latitude__lte=bbox.max_lat)
+    if bbox.min_lng <= bbox.max_lng:
+        return condition & Q(longitude__gte=bbox.min_lng,
+                             longitude__lte=bbox.max_lng)
+    return condition & (Q(longitude__gte=bbox.min_lng) |
+                        Q(longitude__lte=bbox.max_lng))
+
+
+def bbox_contains(bbox, latitude, longitude):
+    """
+    Check if a point is inside a bounding box.
+
+    Parameters:
+        bbox(BoundingBox): Box, may cross the antimeridian.
+        latitude(float): Point latitude.
+        longitude(float): Point longitude.
+    Returns:
+        contained(bool): True if the point is inside the box.
+    """
+    if not bbox.min_lat <= latitude <= bbox.max_lat:
+        return False
+    if bbox.min_lng <= bbox.max_lng:
+        return bbox.min_lng <= longitude <= bbox.max_lng
+    return longitude >= bbox.min_lng or longitude <= bbox.max_lng
+
+
+def radius_bbox(latitude, longitude, radius_m):
+    """
+    Bounding box of a circle.
+
+    Parameters:
+        latitude(float): Center latitude.
+        longitude(float): Center longitude.
+        radius_m(float): Radius in meters.
+    Returns:
+        bbox(BoundingBox): Box containing the circle.
+    """
+    delta_lat = radius_m / METERS_PER_DEGREE
+    min_lat = max(latitude - delta_lat, -90.0)
+    max_lat = min(latitude + delta_lat, 90.0)
+    cos_lat = min(math.cos(math.radians(min_lat)),
+                  math.cos(math.radians(max_lat)))
+    if cos_lat <= 0 or delta_lat / cos_lat >= 180:
+        # The circle reaches a pole, every longitude is in range
+        return BoundingBox(-180.0, min_lat, 180.0, max_lat)
+    delta_lng = delta_lat / cos_lat
+    min_lng = longitude - delta_lng
+    max_lng = longitude + delta_lng
+    # Wrap around the antimeridian
+    if min_lng < -180:
+        min_lng += 360
+    if max_lng > 180:
+        max_lng -= 360
+    return BoundingBox(min_lng, min_lat, max_lng, max_lat)
+
+
+def distance_m(latitude, longitude):
+    """
+    Database expression of the haversine distance from a point.
+
+    Parameters:
+        latitude(float): Point latitude.
+        longitude(float): Point longitude.
+    Returns:
+        expression(Expression): Distance in meters.
+    """
+    lat = Radians(Cast("latitude", models.FloatField()))
+    lng = Radians(Cast("longitude", models.FloatField()))
+    origin_lat = math.radians(latitude)
+    origin_lng = math.radians(longitude)
+    half_chord = (
+        Power(Sin((lat - Value(origin_lat)) / Value(2.0)), 2) +
+        Value(math.cos(origin_lat)) * Cos(lat) *
+        Power(Sin((lng - Value(origin_lng)) / Value(2.0)), 2))
+    # Least() keeps rounding errors out of asin's domain
+    return Value(2 * EARTH_RADIUS_M) * ASin(Least(Sqrt(half_chord), Value(1.0)))
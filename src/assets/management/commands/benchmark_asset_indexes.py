@@ -0,0 +1,157 @@
+"""
+This module benchmarks the asset indexes.
+
+Author: Shashank Shekhar
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from assets.models import AssetUpdates, Assets
+from assets.search import search_assets
+from assets.serializer import FastAssetSerializer
+
+# Indexes added for the hot queries, dropped to measure the "before" plans
+INDEXES = ["assets_valid_com_geo_idx", "asset_updates_asset_status_idx",
+           "assets_valid_search_idx"]
+# Geo IDs of the synthetic communities, far from real ones
+BASE_GEO_ID = 990000000
+
+
+class Command(BaseCommand):
+    """
+    Seeds a large synthetic assets table and prints EXPLAIN ANALYZE of the
+    get_assets and asset update queries with and without their indexes.
+
+    Everything runs in one transaction that is rolled back, so the data and
+    dropped indexes never become visible. It still takes write locks on the
+    tables, so run it against a development database.
+    """
+    help = "EXPLAIN ANALYZE the hot asset queries before and after indexing"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000000,
+                            help="Number of synthetic assets")
+        parser.add_argument("--communities", type=int, default=100,
+                            help="Number of synthetic communities")
+        parser.add_argument("--page-size", type=int, default=1000,
+                            help="get_assets page size")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.stdout.write(f"Seeding {options['rows']} assets in "
+                              f"{options['communities']} communities...")
+            asset_id = seed(options["rows"], options["communities"])
+            queries = hot_queries(BASE_GEO_ID + options["communities"] // 2,
+                                  asset_id, options["page_size"])
+
+            after = explain_all(queries)
+            with connection.cursor() as cursor:
+                for index in INDEXES:
+                    cursor.execute(f"DROP INDEX {index}")
+                # Foreign key index the composite one replaced
+                cursor.execute("CREATE INDEX asset_updates_asset_id_bench "
+                               "ON asset_updates (asset_id)")
+                cursor.execute("ANALYZE assets, asset_updates")
+            before = explain_all(queries)
+
+            for name, _ in queries:
+                self.stdout.write(f"\n=== {name}\n--- before\n{before[name]}"
+                                  f"\n--- after\n{after[name]}")
+            transaction.set_rollback(True)
+
+
+def seed(rows, communities):
+    """
+    Insert synthetic communities, assets and asset updates.
+
+    Parameters:
+        rows(int): Number of assets.
+        communities(int): Number of communities.
+    Returns:
+        asset_id(int): ID of a seeded asset with pending updates.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO communities (geo_id, name, class_code, latitude, longitude) "
+            "SELECT %s + g, 'Community ' || g, '', 40, -80 "
+            "FROM generate_series(0, %s - 1) g",
+            [BASE_GEO_ID, communities])
+        cursor.execute(
+            "INSERT INTO asset_categories (category, description) "
+            "VALUES ('Benchmark category', '') RETURNING id")
+        category_id = cursor.fetchone()[0]
+        cursor.execute("INSERT INTO sources (name) "
+                       "VALUES ('Benchmark source') RETURNING id")
+        source_id = cursor.fetchone()[0]
+        # A quarter of the assets are not valid (status != 0)
+        cursor.execute(
+            "INSERT INTO assets (name, type, community_geo_id, community_name, "
+            "community_id, source_id, category_id, description, website, "
+            "latitude, longitude, address, timestamp, status) "
+            "SELECT 'Asset ' || g, 0, c.geo_id, c.name, c.id, %s, %s, "
+            "'Description', '', 40 + random(), -80 + random(), 'Address', "
+            "now(), CASE WHEN g %% 4 = 0 THEN 2 ELSE 0 END "
+            "FROM generate_series(1, %s) g "
+            "JOIN communities c ON c.geo_id = %s + g %% %s",
+            [source_id, category_id, rows, BASE_GEO_ID, communities])
+        # One update for every tenth asset, half of them under review
+        cursor.execute(
+            "INSERT INTO asset_updates (asset_id, name, community_id, "
+            "category_id, description, website, latitude, longitude, "
+            "address, timestamp, type, status) "
+            "SELECT id, name, community_id, category_id, '', '', latitude, "
+            "longitude, address, now(), 0, CASE WHEN id %% 20 = 0 THEN 1 ELSE 2 END "
+            "FROM assets WHERE community_geo_id >= %s AND id %% 10 = 0",
+            [BASE_GEO_ID])
+        cursor.execute("SELECT max(asset_id) FROM asset_updates "
+                       "WHERE status = 1")
+        asset_id = cursor.fetchone()[0]
+        # Run deferred foreign key checks now, indexes can't change until then
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute("ANALYZE communities, assets, asset_updates")
+    return asset_id
+
+
+def hot_queries(community_geo_id, asset_id, page_size):
+    """
+    Build the queries to explain.
+
+    Parameters:
+        community_geo_id(int): Community to list.
+        asset_id(int): Asset to look updates up for.
+        page_size(int): get_assets page size.
+    Returns:
+        queries(list): (name, queryset) pairs.
+    """
+    valid = Assets.objects.filter(status__exact=0,
+                                  community_geo_id__exact=community_geo_id)
+    rows = FastAssetSerializer.rows(valid)
+    return [
+        ("get_assets first page",
+         rows.order_by("community_geo_id", "id")[:page_size + 1]),
+        ("get_assets paginate=false", rows),
+        ("pending updates of an asset",
+         AssetUpdates.objects.filter(asset_id=asset_id, status=1)),
+        ("search",
+         FastAssetSerializer.rows(search_assets(
+             Assets.objects.filter(status__exact=0), f"asset {asset_id}"))[:20]),
+    ]
+
+
+def explain_all(queries):
+    """
+    EXPLAIN ANALYZE querysets.
+
+    Parameters:
+        queries(list): (name, queryset) pairs.
+    Returns:
+        plans(dict): Plan text by query name.
+    """
+    plans = {}
+    with connection.cursor() as cursor:
+        for name, queryset in queries:
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", params)
+            plans[name] = "\n".join(row[0] for row in cursor.fetchall())
+    return plans
@@ -0,0 +1,117 @@
+"""
+This module benchmarks the asset serializers.
+
+Author: Shashank Shekhar
+"""
+
+import datetime
+import decimal
+import random
+import time
+from collections import namedtuple
+from functools import partial
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from assets.models import Assets
+from assets.serializer import AssetSerializer, FastAssetSerializer
+
+
+class Command(BaseCommand):
+    """
+    Compares AssetSerializer with FastAssetSerializer on synthetic rows.
+
+    The DRF path includes building model instances from the rows, which is
+    what the ORM does before AssetSerializer can run. No database is used.
+    """
+    help = "Benchmark AssetSerializer against FastAssetSerializer"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+",
+                            default=[1000, 10000, 100000],
+                            help="Row counts to benchmark")
+        parser.add_argument("--repeat", type=int, default=3,
+                            help="Runs per size, the best one is reported")
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        self.stdout.write(f"{'rows':>8} {'drf (s)':>10} {'fast (s)':>10} "
+                          f"{'speedup':>8} {'identical':>10}")
+        for size in options["sizes"]:
+            rows = synthetic_rows(size)
+            drf_time, drf_data = best_of(partial(drf_serialize, rows),
+                                         options["repeat"])
+            fast_time, fast_data = best_of(partial(fast_serialize, rows),
+                                           options["repeat"])
+            identical = renderer.render(drf_data) == renderer.render(fast_data)
+            self.stdout.write(f"{size:>8} {drf_time:>10.3f} {fast_time:>10.3f} "
+                              f"{drf_time / fast_time:>7.1f}x {str(identical):>10}")
+
+
+def drf_serialize(rows):
+    """Instantiate models from rows and serialize them with DRF"""
+    instances = [Assets(**row._asdict()) for row in rows]
+    return AssetSerializer(instances, many=True).data
+
+
+def fast_serialize(rows):
+    """Serialize rows with FastAssetSerializer"""
+    return FastAssetSerializer(rows, many=True).data
+
+
+def synthetic_rows(size):
+    """
+    Build rows shaped like FastAssetSerializer.rows() output.
+
+    Parameters:
+        size(int): Number of rows.
+    Returns:
+        rows(list): Named tuples of asset columns.
+    """
+    row_class = namedtuple("Row", FastAssetSerializer.fields)
+    rng = random.Random(size)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    quantum = decimal.Decimal(".1") ** 10
+    rows = []
+    for index in range(size):
+        values = {
+            "id": index + 1,
+            "name": f"Asset {index}",
+            "type": 0,
+            "community_geo_id": 4250408,
+            "community_name": "Monongahela",
+            "community_id": 1,
+            "source_id": 1,
+            "category_id": rng.randint(1, 20),
+            "description": "Community asset description " * 3,
+            "website": "https://example.org",
+            "latitude": decimal.Decimal(rng.uniform(39, 41)).quantize(quantum),
+            "longitude": decimal.Decimal(rng.uniform(-81, -79)).quantize(quantum),
+            "address": f"{index} Main St, Monongahela, PA",
+            "timestamp": now - datetime.timedelta(seconds=index),
+            "status": 0,
+        }
+        # Columns the serializer has and this doesn't set are null
+        rows.append(row_class(**{field: values.get(field)
+                                 for field in FastAssetSerializer.fields}))
+    return rows
+
+
+def best_of(func, repeat):
+    """
+    Time a function.
+
+    Parameters:
+        func(callable): Function to time.
+        repeat(int): Number of runs.
+    Returns:
+        (float, object): Best wall time in seconds and the last result.
+    """
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
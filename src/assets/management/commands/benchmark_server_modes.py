@@ -0,0 +1,136 @@
+"""
+This module benchmarks the WSGI and ASGI serving modes under load.
+
+Author: Shashank Shekhar
+"""
+
+import os
+import statistics
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+# Server command of each SERVER_MODE, as run by entrypoint.sh
+SERVERS = {
+    "wsgi": ["gunicorn", "asset_mappr.wsgi:application"],
+    "asgi": ["gunicorn", "asset_mappr.asgi:application",
+             "--worker-class", "uvicorn_worker.UvicornWorker"],
+}
+
+
+class Command(BaseCommand):
+    """
+    Starts a local server in each mode and sends it concurrent requests,
+    then prints the throughput and latency percentiles of each.
+
+    Requests hit the configured database, so run it against development
+    data. Logins are measured only if credentials of an existing user are
+    given.
+    """
+    help = "Compare throughput and p99 latency of the WSGI and ASGI modes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/assets/get_assets?page_size=100",
+                            help="GET path to load")
+        parser.add_argument("--login", metavar="EMAIL:PASSWORD",
+                            help="Also load the login of this user")
+        parser.add_argument("--requests", type=int, default=2000,
+                            help="Requests per mode and path")
+        parser.add_argument("--concurrency", type=int, default=64,
+                            help="Requests in flight")
+        parser.add_argument("--workers", type=int, default=2,
+                            help="Server worker processes")
+        parser.add_argument("--port", type=int, default=8765)
+
+    def handle(self, *args, **options):
+        scenarios = [("GET " + options["path"], "get", options["path"], None)]
+        if options["login"]:
+            email, _, password = options["login"].partition(":")
+            scenarios.append(("POST /api/user/login", "post", "/api/user/login",
+                              {"email": email, "password": password}))
+
+        self.stdout.write(f"{'mode':<6}{'request':<48}{'req/s':>9}{'p50 ms':>9}"
+                          f"{'p99 ms':>9}{'errors':>8}")
+        for mode, command in SERVERS.items():
+            base_url = f"http://127.0.0.1:{options['port']}"
+            with subprocess.Popen(
+                    [*command, "--bind", f"127.0.0.1:{options['port']}",
+                     "--workers", str(options["workers"])],
+                    env={**os.environ, "SERVER_MODE": mode},
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) as server:
+                try:
+                    wait_ready(base_url, server)
+                    for name, method, path, body in scenarios:
+                        result = load(method, base_url + path, body,
+                                      options["requests"], options["concurrency"])
+                        self.stdout.write(
+                            f"{mode:<6}{name[:47]:<48}{result['throughput']:>9.0f}"
+                            f"{result['p50'] * 1000:>9.1f}{result['p99'] * 1000:>9.1f}"
+                            f"{result['errors']:>8}")
+                finally:
+                    server.terminate()
+
+
+def wait_ready(base_url, server, timeout=30):
+    """
+    Wait for a server to accept requests.
+
+    Parameters:
+        base_url(string): Server URL.
+        server(Popen): Server process.
+        timeout(int): Seconds to wait.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise CommandError("Server exited, is gunicorn installed?")
+        try:
+            requests.get(base_url, timeout=5)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise CommandError(f"Server not ready after {timeout} s")
+
+
+def load(method, url, body, count, concurrency):
+    """
+    Send concurrent requests and measure them.
+
+    Parameters:
+        method(string): HTTP method.
+        url(string): Request URL.
+        body(dict): JSON body, if any.
+        count(int): Number of requests.
+        concurrency(int): Requests in flight.
+    Returns:
+        result(dict): Throughput in requests per second, p50 and p99
+            latencies in seconds, and number of failed requests.
+    """
+    sessions = threading.local()
+
+    def send(_):
+        if not hasattr(sessions, "session"):
+            sessions.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            response = sessions.session.request(method, url, json=body, timeout=60)
+            failed = response.status_code >= 500
+        except requests.RequestException:
+            failed = True
+        return time.perf_counter() - start, failed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(send, range(count)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {"throughput": count / elapsed,
+            "p50": percentiles[49],
+            "p99": percentiles[98],
+            "errors": sum(failed for _, failed in results)}
@@ -0,0 +1,29 @@
+"""
+This module publishes the static asset snapshots.
+
+Author: Shashank Shekhar
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from assets.models import Communities
+from assets.snapshots import publish_snapshots
+
+
+class Command(BaseCommand):
+    """
+    Writes the static snapshot of every community listing.
+
+    Writes keep the snapshots up to date; this publishes them all, e.g. on
+    deployment or after loading assets with raw SQL.
+    """
+    help = "Publish the static snapshots of the community asset listings"
+
+    def handle(self, *args, **options):
+        if not settings.ASSETS_SNAPSHOT_DIR:
+            raise CommandError("ASSETS_SNAPSHOT_DIR is not set")
+        community_geo_ids = Communities.objects.values_list("geo_id", flat=True)
+        publish_snapshots(community_geo_ids)
+        self.stdout.write(f"Published {len(community_geo_ids)} snapshots "
+                          f"in {settings.ASSETS_SNAPSHOT_DIR}")
@@ -0,0 +1,23 @@
+"""
+This module rebuilds the asset cluster aggregates.
+
+Author: Shashank Shekhar
+"""
+
+from django.core.management.base import BaseCommand
+
+from assets.models import AssetClusters
+
+
+class Command(BaseCommand):
+    """
+    Recomputes asset_clusters from the valid assets.
+
+    Writes keep the aggregates up to date incrementally; this resets them,
+    e.g. after loading assets with raw SQL.
+    """
+    help = "Rebuild the asset cluster aggregates"
+
+    def handle(self, *args, **options):
+        AssetClusters.objects.rebuild()
+        self.stdout.write(f"Rebuilt {AssetClusters.objects.count()} clusters")
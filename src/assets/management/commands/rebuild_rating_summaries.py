@@ -0,0 +1,24 @@
+"""
+This module rebuilds the asset rating summaries.
+
+Author: Shashank Shekhar
+"""
+
+from django.core.management.base import BaseCommand
+
+from assets.models import AssetRatingSummaries
+
+
+class Command(BaseCommand):
+    """
+    Recomputes asset_rating_summaries from the ratings.
+
+    Writes keep the summaries up to date incrementally; this resets them,
+    e.g. after loading ratings with raw SQL.
+    """
+    help = "Rebuild the asset rating summaries"
+
+    def handle(self, *args, **options):
+        AssetRatingSummaries.objects.rebuild()
+        self.stdout.write(f"Rebuilt {AssetRatingSummaries.objects.count()} "
+                          f"rating summaries")
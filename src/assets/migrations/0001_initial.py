@@ -0,0 +1,129 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetRatings',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False, verbose_name='Update ID')),
+                ('timestamp', models.DateTimeField(auto_now=True, verbose_name='Timestamp in UTC')),
+                ('rating_scale', models.SmallIntegerField(default=-1, verbose_name='Rating scale')),
+                ('comment', models.TextField(default='', verbose_name='Comment')),
+            ],
+            options={
+                'db_table': 'asset_ratings',
+            },
+        ),
+        migrations.CreateModel(
+            name='Assets',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False, verbose_name='Asset ID')),
+                ('name', models.CharField(default='', max_length=255, verbose_name="Asset's name")),
+                ('type', models.SmallIntegerField(choices=[(-1, 'Default'), (0, 'Tangible'), (1, 'Intangible')], default=-1, verbose_name='Asset type - 0:Tangible                                         or 1:Intangible')),
+                ('community_geo_id', models.BigIntegerField(default=0, verbose_name='Community name')),
+                ('community_name', models.CharField(default='', max_length=255, verbose_name='Community')),
+                ('description', models.TextField(default='', null=True, verbose_name="Asset's description")),
+                ('website', models.TextField(default='', null=True, verbose_name='Website')),
+                ('latitude', models.DecimalField(decimal_places=10, default=0.0, max_digits=12, verbose_name="Asset's latitude")),
+                ('longitude', models.DecimalField(decimal_places=10, default=0.0, max_digits=12, verbose_name="Asset's longitude")),
+                ('address', models.TextField(default='', verbose_name="Asset's address")),
+                ('timestamp', models.DateTimeField(auto_now=True, verbose_name='Timestamp in UTC')),
+                ('status', models.SmallIntegerField(choices=[(-1, 'Default'), (0, 'Valid'), (1, 'Missing'), (2, 'Suggestion')], default=-1, verbose_name="Asset's status: 0 - exists, 1 - missed, 2 - suggested")),
+            ],
+            options={
+                'db_table': 'assets',
+            },
+        ),
+        migrations.CreateModel(
+            name='Categories',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False, verbose_name='Category ID')),
+                ('category', models.CharField(default='', max_length=255, unique=True, verbose_name='Category')),
+                ('description', models.TextField(default='', verbose_name="Category's description")),
+            ],
+            options={
+                'db_table': 'asset_categories',
+            },
+        ),
+        migrations.CreateModel(
+            name='Communities',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('geo_id', models.IntegerField(unique=True, verbose_name='Geo ID')),
+                ('name', models.CharField(default='', max_length=255, verbose_name='Community name')),
+                ('class_code', models.CharField(default='', max_length=20, verbose_name='Community class code')),
+                ('latitude', models.DecimalField(decimal_places=10, default=0.0, max_digits=12, verbose_name="Community's latitude")),
+                ('longitude', models.DecimalField(decimal_places=10, default=0.0, max_digits=12, verbose_name="Community's longitude")),
+            ],
+            options={
+                'db_table': 'communities',
+            },
+        ),
+        migrations.CreateModel(
+            name='RatingValues',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False, verbose_name='Value ID')),
+                ('value', models.CharField(default='', max_length=255, unique=True, verbose_name='Value')),
+                ('weight', models.SmallIntegerField(default=-1, verbose_name="Value's weightage")),
+            ],
+            options={
+                'db_table': 'rating_values',
+            },
+        ),
+        migrations.CreateModel(
+            name='Sources',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False, verbose_name='Source type')),
+                ('name', models.CharField(default='', max_length=255, unique=True, verbose_name='Source name')),
+            ],
+            options={
+                'db_table': 'sources',
+            },
+        ),
+        migrations.CreateModel(
+            name='AssetUpdates',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False, verbose_name='Update ID')),
+                ('name', models.CharField(default='', max_length=255, verbose_name="Asset's new name")),
+                ('description', models.TextField(default='', verbose_name='Description')),
+                ('website', models.TextField(default='', verbose_name='Website')),
+                ('latitude', models.DecimalField(decimal_places=10, default=0.0, max_digits=12, verbose_name='New latitude')),
+                ('longitude', models.DecimalField(decimal_places=10, default=0.0, max_digits=12, verbose_name='New longitude')),
+                ('address', models.TextField(default='', verbose_name='New address')),
+                ('timestamp', models.DateTimeField(auto_now=True, verbose_name='Timestamp in UTC')),
+                ('type', models.SmallIntegerField(choices=[(-1, 'Default'), (0, 'Modify'), (1, 'Delete')], default=-1, verbose_name='0 - Modify, 1 - Delete')),
+                ('status', models.IntegerField(choices=[(-1, 'Default'), (1, 'Under Review'), (2, 'Accepted'), (3, 'Rejected'), (4, 'Permanently closed'), (5, 'Temporarily closed'), (6, 'Never existed'), (7, 'None')], default=-1, verbose_name='1-Under review;                                     2-Accepted;                                     3-Rejected;                                     4-Permanently closed;                                     5-Temporarily closed;                                     6-Never existed;                                     7-None')),
+                ('asset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='assets.assets')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='assets.categories')),
+                ('community', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='assets.communities')),
+            ],
+            options={
+                'db_table': 'asset_updates',
+            },
+        ),
+        migrations.AddField(
+            model_name='assets',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='assets.categories'),
+        ),
+        migrations.AddField(
+            model_name='assets',
+            name='community',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='assets.communities'),
+        ),
+        migrations.AddField(
+            model_name='assets',
+            name='source',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='assets.sources'),
+        ),
+    ]
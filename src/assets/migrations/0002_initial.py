@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('assets', '0001_initial'),
+        ('user', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assets',
+            name='user',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='user.users'),
+        ),
+        migrations.AddField(
+            model_name='assetratings',
+            name='asset',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='assets.assets'),
+        ),
+        migrations.AddField(
+            model_name='assetratings',
+            name='community',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='assets.communities'),
+        ),
+        migrations.AddField(
+            model_name='assetratings',
+            name='user',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='user.users'),
+        ),
+        migrations.AddField(
+            model_name='assetratings',
+            name='value',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='assets.ratingvalues'),
+        ),
+    ]
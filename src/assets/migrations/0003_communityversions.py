@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommunityVersions',
+            fields=[
+                ('community_geo_id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='Community geo ID')),
+                ('version', models.BigIntegerField(default=0, verbose_name='Data version')),
+                ('timestamp', models.DateTimeField(auto_now=True, verbose_name='Timestamp in UTC')),
+            ],
+            options={
+                'db_table': 'community_versions',
+            },
+        ),
+    ]
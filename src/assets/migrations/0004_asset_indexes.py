@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:28
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are built concurrently so the tables stay writable
+    atomic = False
+
+    dependencies = [
+        ('assets', '0003_communityversions'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='assets',
+            index=models.Index(condition=models.Q(('status', 0)), fields=['community_geo_id', 'id'], name='assets_valid_com_geo_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='assetupdates',
+            index=models.Index(fields=['asset', 'status'], name='asset_updates_asset_status_idx'),
+        ),
+        # The composite index above covers lookups by asset alone
+        migrations.AlterField(
+            model_name='assetupdates',
+            name='asset',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='assets.assets'),
+        ),
+    ]
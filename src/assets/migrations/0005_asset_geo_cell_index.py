@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:30
+
+from decimal import Decimal
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+import django.db.models.expressions
+import django.db.models.functions.comparison
+import django.db.models.functions.math
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('assets', '0004_asset_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='assets',
+            index=models.Index(django.db.models.functions.comparison.Cast(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.functions.math.Floor(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('latitude'), '+', models.Value(90)), '/', models.Value(Decimal('0.010986328125')))), '*', models.Value(32768)), '+', django.db.models.functions.math.Floor(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('longitude'), '+', models.Value(180)), '/', models.Value(Decimal('0.010986328125'))))), models.BigIntegerField()), condition=models.Q(('status', 0)), name='assets_valid_geo_cell_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0005_asset_geo_cell_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetClusters',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False, verbose_name='Cluster ID')),
+                ('zoom', models.SmallIntegerField(verbose_name='Grid zoom level')),
+                ('cell', models.BigIntegerField(verbose_name='Grid cell ID')),
+                ('count', models.IntegerField(default=0, verbose_name='Number of assets')),
+                ('latitude_sum', models.FloatField(default=0.0, verbose_name='Sum of latitudes')),
+                ('longitude_sum', models.FloatField(default=0.0, verbose_name='Sum of longitudes')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='assets.categories')),
+            ],
+            options={
+                'db_table': 'asset_clusters',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='assetclusters',
+            constraint=models.UniqueConstraint(fields=('zoom', 'cell', 'category'), name='asset_clusters_zoom_cell_uniq'),
+        ),
+    ]
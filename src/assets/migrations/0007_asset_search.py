@@ -0,0 +1,54 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:41
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+# Text search configuration, must match assets.search.SEARCH_CONFIG
+CREATE_TRIGGER = """
+CREATE FUNCTION assets_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.address, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER assets_search_vector_update
+BEFORE INSERT OR UPDATE OF name, address, description, search_vector ON assets
+FOR EACH ROW EXECUTE FUNCTION assets_search_vector_update();
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER assets_search_vector_update ON assets;
+DROP FUNCTION assets_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    # The index is built concurrently so the table stays writable
+    atomic = False
+
+    dependencies = [
+        ('assets', '0006_assetclusters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assets',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Full-text search lexemes'),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER, DROP_TRIGGER),
+        # Writing search_vector fires the trigger, which fills it in
+        migrations.RunSQL("UPDATE assets SET search_vector = NULL",
+                          migrations.RunSQL.noop),
+        AddIndexConcurrently(
+            model_name='assets',
+            index=django.contrib.postgres.indexes.GinIndex(condition=models.Q(('status', 0)), fields=['search_vector'], name='assets_valid_search_idx'),
+        ),
+    ]
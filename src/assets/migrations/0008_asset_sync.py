@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:47
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # The assets index is built concurrently so the table stays writable
+    atomic = False
+
+    dependencies = [
+        ('assets', '0007_asset_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetTombstones',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False, verbose_name='Tombstone ID')),
+                ('asset_id', models.BigIntegerField(verbose_name="Deleted asset's ID")),
+                ('community_geo_id', models.BigIntegerField(verbose_name='Community geo ID')),
+                ('timestamp', models.DateTimeField(auto_now_add=True, verbose_name='Timestamp in UTC')),
+            ],
+            options={
+                'db_table': 'asset_tombstones',
+            },
+        ),
+        AddIndexConcurrently(
+            model_name='assets',
+            index=models.Index(fields=['community_geo_id', 'timestamp'], name='assets_com_geo_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assettombstones',
+            index=models.Index(fields=['community_geo_id', 'timestamp'], name='asset_tombstones_com_geo_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0008_asset_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetRatingSummaries',
+            fields=[
+                ('asset', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_summary', serialize=False, to='assets.assets')),
+                ('count', models.IntegerField(default=0, verbose_name='Number of ratings')),
+                ('weight_sum', models.BigIntegerField(default=0, verbose_name='Sum of rating weights')),
+                ('histogram', models.JSONField(default=dict, verbose_name='Ratings by value ID')),
+                ('last_rated', models.DateTimeField(null=True, verbose_name='Latest rating timestamp in UTC')),
+            ],
+            options={
+                'db_table': 'asset_rating_summaries',
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:35
+
+from decimal import Decimal
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+import django.db.models.expressions
+import django.db.models.functions.comparison
+import django.db.models.functions.math
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('assets', '0009_assetratingsummaries'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='assets',
+            index=models.Index(django.db.models.functions.comparison.Cast(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.functions.math.Floor(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('latitude'), '+', models.Value(90)), '/', models.Value(Decimal('0.703125')))), '*', models.Value(512)), '+', django.db.models.functions.math.Floor(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('longitude'), '+', models.Value(180)), '/', models.Value(Decimal('0.703125'))))), models.BigIntegerField()), condition=models.Q(('status', 0)), name='assets_valid_coarse_cell_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:40
+# pylint: disable=duplicate-code
+
+from django.db import migrations
+from django.db.models import Count, FloatField, Sum
+from django.db.models.functions import Cast
+
+from assets.geo import geo_cell
+
+# AssetClusters.ZOOMS
+ZOOMS = range(1, 15)
+
+
+def backfill_clusters(apps, schema_editor):
+    """Compute the cluster aggregates once, writes keep them up to date"""
+    Assets = apps.get_model("assets", "Assets")
+    with schema_editor.connection.cursor() as cursor:
+        # Asset writes wait, their incremental changes can't interleave
+        cursor.execute("LOCK TABLE assets IN SHARE MODE")
+        cursor.execute("DELETE FROM asset_clusters")
+        for zoom in ZOOMS:
+            aggregates = Assets.objects.filter(status__exact=0) \
+                .annotate(cell=geo_cell(zoom)) \
+                .values("cell", "category_id") \
+                .annotate(count=Count("id"),
+                          latitude_sum=Sum(Cast("latitude", FloatField())),
+                          longitude_sum=Sum(Cast("longitude", FloatField())))
+            sql, params = aggregates.query.sql_with_params()
+            cursor.execute(
+                "INSERT INTO asset_clusters (zoom, cell, category_id, count, "
+                "latitude_sum, longitude_sum) "
+                "SELECT %s, cell, category_id, count, latitude_sum, "
+                "longitude_sum FROM (" + sql + ") aggregates",
+                [zoom, *params])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0010_asset_coarse_cell_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_clusters, migrations.RunPython.noop),
+    ]
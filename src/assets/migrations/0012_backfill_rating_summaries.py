@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:45
+
+from django.db import migrations
+
+# Computed once, writes keep the summaries up to date. Rating writes wait
+# on the lock, their incremental changes can't interleave.
+BACKFILL_RATING_SUMMARIES = """
+LOCK TABLE asset_ratings IN SHARE MODE;
+DELETE FROM asset_rating_summaries;
+INSERT INTO asset_rating_summaries (asset_id, count, weight_sum, histogram,
+                                    last_rated)
+SELECT asset_id, sum(count), sum(count * weight),
+       jsonb_object_agg(value_id, count), max(last_rated)
+FROM (SELECT r.asset_id, r.value_id, v.weight,
+             count(*) AS count, max(r.timestamp) AS last_rated
+      FROM asset_ratings r JOIN rating_values v ON v.id = r.value_id
+      GROUP BY r.asset_id, r.value_id, v.weight) histogram
+GROUP BY asset_id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0011_backfill_asset_clusters'),
+    ]
+
+    operations = [
+        migrations.RunSQL(BACKFILL_RATING_SUMMARIES, migrations.RunSQL.noop),
+    ]
@@ -4,7 +4,16 @@ This module defines models.
 Author: Shashank Shekhar, Niranjan Kumawat
 """
 
-from django.db import models
+from collections import defaultdict
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import connection, models, transaction
+from django.db.models import Count, FloatField, Q, Sum
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .geo import COARSE_GEO_CELL_ZOOM, cell_of, geo_cell
 
 
 class Categories(models.Model):
@@ -145,6 +154,8 @@ class Assets(models.Model):
         address (string): Asset's address
         timestamp (datetime): Create/update timestamp in UTC
         status (int): 0 - exists, 1 - missed, 2 - suggested
+        search_vector (tsvector): Weighted name, address and description
+            lexemes, maintained by a database trigger
 
         objects(objects): Collection of objects. Part of Django.
     """
@@ -210,12 +221,45 @@ class Assets(models.Model):
         choices=STATUS_CHOICES,
         default=-1,
         verbose_name="Asset's status: 0 - exists, 1 - missed, 2 - suggested")
+    # Set by the assets_search_vector_update trigger on insert and update
+    search_vector = SearchVectorField(null=True,
+                                      editable=False,
+                                      verbose_name="Full-text search lexemes")
 
     objects = models.Manager()
 
     class Meta:
         """Table for assets"""
         db_table = "assets"
+        indexes = [
+            # Valid assets of a community, in get_assets pagination order
+            models.Index(fields=["community_geo_id", "id"],
+                         condition=Q(status=0),
+                         name="assets_valid_com_geo_idx"),
+            # Grid cell of valid assets, for bounding box and radius queries
+            models.Index(geo_cell(),
+                         condition=Q(status=0),
+                         name="assets_valid_geo_cell_idx"),
+            # Coarse grid cell of valid assets, for boxes too tall for the
+            # fine one
+            models.Index(geo_cell(COARSE_GEO_CELL_ZOOM),
+                         condition=Q(status=0),
+                         name="assets_valid_coarse_cell_idx"),
+            # Full-text search of valid assets
+            GinIndex(fields=["search_vector"],
+                     condition=Q(status=0),
+                     name="assets_valid_search_idx"),
+            # Assets of a community changed since a time, of any status
+            models.Index(fields=["community_geo_id", "timestamp"],
+                         name="assets_com_geo_timestamp_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Keep loaded values to tell what a later save changed"""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))  # pylint: disable=protected-access
+        return instance
 
 
 class AssetUpdates(models.Model):
@@ -264,8 +308,10 @@ class AssetUpdates(models.Model):
     ]
     id = models.BigAutoField(primary_key=True, verbose_name="Update ID")
     # many(asset_upates)-to-one(asset)
+    # Indexed by asset_updates_asset_status_idx
     asset = models.ForeignKey("Assets",
-                              on_delete=models.CASCADE)
+                              on_delete=models.CASCADE,
+                              db_index=False)
     name = models.CharField(max_length=255,
                             default="",
                             verbose_name="Asset's new name")
@@ -310,6 +356,10 @@ class AssetUpdates(models.Model):
     class Meta:
         """Table for asset_updates"""
         db_table = "asset_updates"
+        indexes = [
+            models.Index(fields=["asset", "status"],
+                         name="asset_updates_asset_status_idx"),
+        ]
 
 
 class AssetRatings(models.Model):
@@ -329,6 +379,7 @@ class AssetRatings(models.Model):
         objects(objects): Collection of objects. Part of Django.
     """
     id = models.BigAutoField(primary_key=True, verbose_name="Update ID")
+    # Foreign key index serves the per-asset lookups
     asset = models.ForeignKey("Assets",
                               on_delete=models.CASCADE)
     community = models.ForeignKey("Communities",
@@ -351,3 +402,402 @@ class AssetRatings(models.Model):
     class Meta:
         """Table for asset_ratings"""
         db_table = "asset_ratings"
+
+
+class AssetTombstones(models.Model):
+    """
+    AssetTombstones ORM model.
+
+    Assets deleted from the assets table, so syncing clients learn about
+    them.
+
+    Attributes:
+        id (bigint): Tombstone ID
+        asset_id (bigint): Deleted asset's ID
+        community_geo_id (bigint): Community geo ID of the deleted asset
+        timestamp (datetime): Deletion timestamp in UTC
+
+        objects(objects): Collection of objects. Part of Django.
+    """
+    id = models.BigAutoField(primary_key=True, verbose_name="Tombstone ID")
+    asset_id = models.BigIntegerField(verbose_name="Deleted asset's ID")
+    community_geo_id = models.BigIntegerField(verbose_name="Community geo ID")
+    timestamp = models.DateTimeField(null=False,
+                                     auto_now_add=True,
+                                     verbose_name="Timestamp in UTC")
+
+    objects = models.Manager()
+
+    class Meta:
+        """Table for asset_tombstones"""
+        db_table = "asset_tombstones"
+        indexes = [
+            models.Index(fields=["community_geo_id", "timestamp"],
+                         name="asset_tombstones_com_geo_idx"),
+        ]
+
+
+class CommunityVersionManager(models.Manager):
+    """Community version manager class"""
+
+    def current(self, community_geo_id):
+        """
+        Current data version of a community.
+
+        Parameters:
+            community_geo_id(int): Community geo ID or ALL_COMMUNITIES.
+        Returns:
+            version(int): Version, 0 if the community was never written.
+        """
+        if community_geo_id == self.model.ALL_COMMUNITIES:
+            versions = self.all_communities().aggregate(version=Sum("version"))
+            return versions["version"] or 0
+        version = self.filter(community_geo_id=community_geo_id) \
+            .values_list("version", flat=True).first()
+        return version or 0
+
+    async def acurrent(self, community_geo_id):
+        """
+        Current data version of a community, with the async ORM.
+
+        Parameters:
+            community_geo_id(int): Community geo ID or ALL_COMMUNITIES.
+        Returns:
+            version(int): Version, 0 if the community was never written.
+        """
+        if community_geo_id == self.model.ALL_COMMUNITIES:
+            versions = await self.all_communities().aaggregate(version=Sum("version"))
+            return versions["version"] or 0
+        version = await self.filter(community_geo_id=community_geo_id) \
+            .values_list("version", flat=True).afirst()
+        return version or 0
+
+    def all_communities(self):
+        """
+        Versions the ALL_COMMUNITIES version is the sum of.
+
+        Every bump adds one to the sum, so it changes with any community
+        without writers sharing a row. Rows of ALL_COMMUNITIES bumped before
+        are left out.
+        """
+        return self.exclude(community_geo_id=self.model.ALL_COMMUNITIES)
+
+    def current_many(self, community_geo_ids):
+        """
+        Current data versions of communities in a single query.
+
+        Parameters:
+            community_geo_ids(iterable): Community geo IDs.
+        Returns:
+            versions(dict): Version by geo ID, 0 if never written.
+        """
+        versions = dict.fromkeys(community_geo_ids, 0)
+        versions.update(self.filter(community_geo_id__in=list(versions))
+                        .values_list("community_geo_id", "version"))
+        return versions
+
+    def bump(self, community_geo_ids):
+        """
+        Bump the data version of communities in a single statement.
+
+        The version of ALL_COMMUNITIES follows, see all_communities.
+
+        Parameters:
+            community_geo_ids(iterable): Geo IDs of the changed communities.
+        """
+        # Sorted so concurrent bumps lock rows in the same order
+        keys = sorted(set(community_geo_ids))
+        if not keys:
+            return
+        now = timezone.now()
+        table = self.model._meta.db_table  # pylint: disable=protected-access
+        values = ", ".join(["(%s, 1, %s)"] * len(keys))
+        params = [param for key in keys for param in (key, now)]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (community_geo_id, version, timestamp) "
+                f"VALUES {values} "
+                f"ON CONFLICT (community_geo_id) DO UPDATE "
+                f"SET version = {table}.version + 1, "
+                f"timestamp = EXCLUDED.timestamp",
+                params)
+
+
+class CommunityVersions(models.Model):
+    """
+    CommunityVersions ORM model.
+
+    Data version of each community's assets, used to validate cached
+    asset payloads.
+
+    Attributes:
+        community_geo_id (bigint): Community geo ID
+        version (bigint): Bumped on every write to the community's assets
+        timestamp (datetime): Last bump timestamp in UTC
+
+        objects(objects): Collection of objects. Part of Django.
+    """
+    # Un-scoped listings, their version is derived from all the others
+    ALL_COMMUNITIES = -1
+
+    community_geo_id = models.BigIntegerField(primary_key=True,
+                                              verbose_name="Community geo ID")
+    version = models.BigIntegerField(default=0,
+                                     verbose_name="Data version")
+    timestamp = models.DateTimeField(null=False,
+                                     auto_now=True,
+                                     verbose_name="Timestamp in UTC")
+
+    objects = CommunityVersionManager()
+
+    class Meta:
+        """Table for community_versions"""
+        db_table = "community_versions"
+
+
+def cluster_deltas(zooms, removed, added):
+    """
+    Changes of the cluster aggregates caused by asset changes.
+
+    Parameters:
+        zooms(iterable): Zoom levels.
+        removed(iterable): (latitude, longitude, category_id) to subtract.
+        added(iterable): (latitude, longitude, category_id) to add.
+    Returns:
+        deltas(dict): [count, latitude sum, longitude sum] changes by
+            (zoom, cell, category_id), without unchanged keys.
+    """
+    deltas = defaultdict(lambda: [0, 0.0, 0.0])
+    for sign, points in ((-1, removed), (1, added)):
+        for latitude, longitude, category_id in points:
+            for zoom in zooms:
+                delta = deltas[(zoom, cell_of(latitude, longitude, zoom),
+                                category_id)]
+                delta[0] += sign
+                delta[1] += sign * float(latitude)
+                delta[2] += sign * float(longitude)
+    # A move within a cell leaves its aggregates unchanged
+    return {key: delta for key, delta in deltas.items() if any(delta)}
+
+
+class AssetClusterManager(models.Manager):
+    """Asset cluster manager class"""
+
+    def apply_changes(self, removed=(), added=()):
+        """
+        Update the cluster aggregates of all zoom levels in one statement.
+
+        Parameters:
+            removed(iterable): (latitude, longitude, category_id) of assets
+                that stopped being valid or moved away.
+            added(iterable): (latitude, longitude, category_id) of assets
+                that became valid or moved in.
+        """
+        deltas = cluster_deltas(self.model.ZOOMS, removed, added)
+        keys = sorted(deltas)
+        if not keys:
+            return
+
+        table = self.model._meta.db_table  # pylint: disable=protected-access
+        values = ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(keys))
+        params = [param for key in keys for param in (*key, *deltas[key])]
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (zoom, cell, category_id, count, "
+                f"latitude_sum, longitude_sum) VALUES {values} "
+                f"ON CONFLICT (zoom, cell, category_id) DO UPDATE "
+                f"SET count = {table}.count + EXCLUDED.count, "
+                f"latitude_sum = {table}.latitude_sum + EXCLUDED.latitude_sum, "
+                f"longitude_sum = {table}.longitude_sum + EXCLUDED.longitude_sum",
+                params)
+            # Only keys that lost assets may have emptied
+            shrunk = [key for key in keys if deltas[key][0] < 0]
+            if shrunk:
+                rows = ", ".join(["(%s, %s, %s)"] * len(shrunk))
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE (zoom, cell, category_id) "
+                    f"IN (VALUES {rows}) AND count <= 0",
+                    [param for key in shrunk for param in key])
+
+    def rebuild(self):
+        """Recompute all cluster aggregates from the valid assets"""
+        table = self.model._meta.db_table  # pylint: disable=protected-access
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Asset writes wait, their incremental changes can't interleave
+            cursor.execute("LOCK TABLE assets IN SHARE MODE")
+            cursor.execute(f"DELETE FROM {table}")
+            for zoom in self.model.ZOOMS:
+                aggregates = Assets.objects.filter(status__exact=0) \
+                    .annotate(cell=geo_cell(zoom)) \
+                    .values("cell", "category_id") \
+                    .annotate(count=Count("id"),
+                              latitude_sum=Sum(Cast("latitude", FloatField())),
+                              longitude_sum=Sum(Cast("longitude", FloatField())))
+                sql, params = aggregates.query.sql_with_params()
+                cursor.execute(
+                    f"INSERT INTO {table} (zoom, cell, category_id, count, "
+                    f"latitude_sum, longitude_sum) "
+                    f"SELECT %s, cell, category_id, count, latitude_sum, "
+                    f"longitude_sum FROM ({sql}) aggregates",
+                    [zoom, *params])
+
+
+class AssetClusters(models.Model):
+    """
+    AssetClusters ORM model.
+
+    Count and coordinate sums of the valid assets of each category in each
+    grid cell, per zoom level. See geo.py for the grid.
+
+    Attributes:
+        id (bigint): Cluster ID
+        zoom (smallint): Grid zoom level
+        cell (bigint): Grid cell ID
+        category_id (int): Category's ID
+        count (int): Number of assets
+        latitude_sum (double): Sum of the assets' latitudes
+        longitude_sum (double): Sum of the assets' longitudes
+
+        objects(objects): Collection of objects. Part of Django.
+    """
+    # Zoom levels kept up to date, finer ones are served by get_assets
+    ZOOMS = range(1, 15)
+
+    id = models.BigAutoField(primary_key=True, verbose_name="Cluster ID")
+    zoom = models.SmallIntegerField(verbose_name="Grid zoom level")
+    cell = models.BigIntegerField(verbose_name="Grid cell ID")
+    category = models.ForeignKey("Categories",
+                                 on_delete=models.CASCADE)
+    count = models.IntegerField(default=0,
+                                verbose_name="Number of assets")
+    latitude_sum = models.FloatField(default=0.0,
+                                     verbose_name="Sum of latitudes")
+    longitude_sum = models.FloatField(default=0.0,
+                                      verbose_name="Sum of longitudes")
+
+    objects = AssetClusterManager()
+
+    class Meta:
+        """Table for asset_clusters"""
+        db_table = "asset_clusters"
+        constraints = [
+            # Also serves cell range lookups per zoom level
+            models.UniqueConstraint(fields=["zoom", "cell", "category"],
+                                    name="asset_clusters_zoom_cell_uniq"),
+        ]
+
+
+class AssetRatingSummaryManager(models.Manager):
+    """Asset rating summary manager class"""
+
+    def apply_changes(self, changes):
+        """
+        Add and remove ratings from the summaries of their assets in one
+        statement.
+
+        Parameters:
+            changes(iterable): (asset_id, value_id, delta, rated_at) of
+                ratings - delta 1 and the rating time to add one, delta -1
+                to remove one.
+        """
+        deltas = {}
+        for asset_id, value_id, delta, rated_at in changes:
+            count, last_rated = deltas.get((asset_id, value_id), (0, None))
+            if rated_at is not None and (last_rated is None or rated_at > last_rated):
+                last_rated = rated_at
+            deltas[(asset_id, value_id)] = (count + delta, last_rated)
+        # A re-saved rating nets to no count change but may be newer
+        keys = sorted(key for key, (count, last_rated) in deltas.items()
+                      if count or last_rated is not None)
+        if not keys:
+            return
+        # Removals may remove the latest rating or the last one of a value
+        shrunk = sorted({asset_id for asset_id, value_id in keys
+                         if deltas[(asset_id, value_id)][0] < 0})
+
+        table = self.model._meta.db_table  # pylint: disable=protected-access
+        values = ", ".join(["(%s::bigint, %s::int, %s::int, %s::timestamptz)"] * len(keys))
+        params = [param for key in keys for param in (*key, *deltas[key])]
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (asset_id, count, weight_sum, histogram, "
+                f"last_rated) "
+                f"SELECT c.asset_id, sum(c.delta), sum(c.delta * v.weight), "
+                f"jsonb_object_agg(c.value_id, c.delta), max(c.rated_at) "
+                f"FROM (VALUES {values}) c (asset_id, value_id, delta, rated_at) "
+                f"JOIN rating_values v ON v.id = c.value_id "
+                f"GROUP BY c.asset_id "
+                f"ON CONFLICT (asset_id) DO UPDATE "
+                f"SET count = {table}.count + EXCLUDED.count, "
+                f"weight_sum = {table}.weight_sum + EXCLUDED.weight_sum, "
+                f"histogram = {table}.histogram || (SELECT jsonb_object_agg(key, "
+                f"coalesce(({table}.histogram ->> key)::int, 0) + value::int) "
+                f"FROM jsonb_each_text(EXCLUDED.histogram)), "
+                f"last_rated = greatest({table}.last_rated, EXCLUDED.last_rated)",
+                params)
+            if shrunk:
+                cursor.execute(
+                    f"UPDATE {table} s SET last_rated = (SELECT max(timestamp) "
+                    f"FROM asset_ratings WHERE asset_id = s.asset_id), "
+                    f"histogram = (SELECT coalesce(jsonb_object_agg(key, value), "
+                    f"'{{}}') FROM jsonb_each(s.histogram) "
+                    f"WHERE (value #>> '{{}}')::int > 0) "
+                    f"WHERE asset_id = ANY(%s)",
+                    [shrunk])
+                cursor.execute(f"DELETE FROM {table} "
+                               f"WHERE asset_id = ANY(%s) AND count <= 0",
+                               [shrunk])
+
+    def rebuild(self):
+        """Recompute all rating summaries from the ratings"""
+        table = self.model._meta.db_table  # pylint: disable=protected-access
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Rating writes wait, their incremental changes can't interleave
+            cursor.execute("LOCK TABLE asset_ratings IN SHARE MODE")
+            cursor.execute(f"DELETE FROM {table}")
+            cursor.execute(
+                f"INSERT INTO {table} (asset_id, count, weight_sum, histogram, "
+                f"last_rated) "
+                f"SELECT asset_id, sum(count), sum(count * weight), "
+                f"jsonb_object_agg(value_id, count), max(last_rated) "
+                f"FROM (SELECT r.asset_id, r.value_id, v.weight, "
+                f"count(*) AS count, max(r.timestamp) AS last_rated "
+                f"FROM asset_ratings r JOIN rating_values v ON v.id = r.value_id "
+                f"GROUP BY r.asset_id, r.value_id, v.weight) histogram "
+                f"GROUP BY asset_id")
+
+
+class AssetRatingSummaries(models.Model):
+    """
+    AssetRatingSummaries ORM model.
+
+    Aggregate of the ratings of each rated asset, kept up to date as
+    ratings are written.
+
+    Attributes:
+        asset_id (bigint): Asset's ID
+        count (int): Number of ratings
+        weight_sum (bigint): Sum of the weights of the rating values
+        histogram (json): Number of ratings by rating value ID
+        last_rated (datetime): Timestamp of the latest rating in UTC
+
+        objects(objects): Collection of objects. Part of Django.
+    """
+    asset = models.OneToOneField("Assets",
+                                 primary_key=True,
+                                 on_delete=models.CASCADE,
+                                 related_name="rating_summary")
+    count = models.IntegerField(default=0,
+                                verbose_name="Number of ratings")
+    weight_sum = models.BigIntegerField(default=0,
+                                        verbose_name="Sum of rating weights")
+    histogram = models.JSONField(default=dict,
+                                 verbose_name="Ratings by value ID")
+    last_rated = models.DateTimeField(null=True,
+                                      verbose_name="Latest rating timestamp in UTC")
+
+    objects = AssetRatingSummaryManager()
+
+    class Meta:
+        """Table for asset_rating_summaries"""
+        db_table = "asset_rating_summaries"
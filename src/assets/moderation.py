@@ -0,0 +1,126 @@
+"""
+This module applies moderated asset updates in bulk.
+
+Author: Shashank Shekhar
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AssetClusters, AssetUpdates, Assets, Communities
+from .signals import TRACKED_FIELDS, cluster_point, leave_moved_tombstones, \
+    notify_assets_changed
+
+UNDER_REVIEW = 1
+ACCEPTED = 2
+REJECTED = 3
+MODIFY = 0
+DELETE = 1
+# Asset status of assets removed by an accepted Delete update
+MISSING = 1
+# Asset fields set from an accepted Modify update
+MODIFIED_FIELDS = ("name", "community_id", "category_id", "description",
+                   "website", "latitude", "longitude", "address")
+
+
+def moderate(accept_ids, reject_ids, community_geo_id):
+    """
+    Accept and reject asset updates under review, in one transaction.
+
+    The updates and their assets are locked, so an update moderated
+    concurrently is skipped rather than applied twice. Accepted updates are
+    applied in ID order with a single bulk update of the assets.
+
+    Parameters:
+        accept_ids(iterable): IDs of the updates to accept.
+        reject_ids(iterable): IDs of the updates to reject.
+        community_geo_id(int): Moderator's community, updates of assets
+            of other communities are skipped.
+    Returns:
+        result(dict): IDs of the accepted, rejected and skipped updates -
+            skipped if not found, not under review or of another community.
+    """
+    accept_ids, reject_ids = set(accept_ids), set(reject_ids)
+    now = timezone.now()
+    with transaction.atomic():
+        # Only the updates are locked here, assets are locked in ID order below
+        updates = list(AssetUpdates.objects.select_for_update(of=("self",))
+                       .filter(id__in=accept_ids | reject_ids, status=UNDER_REVIEW,
+                               asset__community_geo_id=community_geo_id)
+                       .order_by("id"))
+        accepted = [update for update in updates if update.id in accept_ids]
+        rejected = [update.id for update in updates if update.id not in accept_ids]
+
+        assets = Assets.objects.select_for_update() \
+            .filter(id__in={update.asset_id for update in accepted}) \
+            .order_by("id").in_bulk()
+        before = {asset_id: {field: getattr(asset, field) for field in TRACKED_FIELDS}
+                  for asset_id, asset in assets.items()}
+        apply_updates(assets, accepted, now)
+        Assets.objects.bulk_update(assets.values(),
+                                   [*MODIFIED_FIELDS, "community_geo_id",
+                                    "community_name", "status", "timestamp"])
+
+        AssetUpdates.objects.filter(id__in=[update.id for update in accepted]) \
+            .update(status=ACCEPTED, timestamp=now)
+        AssetUpdates.objects.filter(id__in=rejected) \
+            .update(status=REJECTED, timestamp=now)
+
+        update_derived_data(before, assets)
+
+    return {"accepted": [update.id for update in accepted],
+            "rejected": rejected,
+            "skipped": sorted((accept_ids | reject_ids) -
+                              {update.id for update in updates})}
+
+
+def update_derived_data(before, assets):
+    """
+    Update clusters, tombstones and versions after moderated assets changed.
+
+    Parameters:
+        before(dict): Tracked field values of the assets before the
+            changes, by ID.
+        assets(dict): Changed assets by ID.
+    """
+    removed, added, moves, community_geo_ids = [], [], [], set()
+    for asset_id, asset in assets.items():
+        after = {field: getattr(asset, field) for field in TRACKED_FIELDS}
+        if cluster_point(before[asset_id]) != cluster_point(after):
+            removed.append(cluster_point(before[asset_id]))
+            added.append(cluster_point(after))
+        moves.append((asset_id, before[asset_id]["community_geo_id"],
+                      after["community_geo_id"]))
+        community_geo_ids |= {before[asset_id]["community_geo_id"],
+                              after["community_geo_id"]}
+    AssetClusters.objects.apply_changes(removed=filter(None, removed),
+                                        added=filter(None, added))
+    leave_moved_tombstones(moves)
+    if community_geo_ids:
+        notify_assets_changed(community_geo_ids)
+
+
+def apply_updates(assets, updates, now):
+    """
+    Apply accepted updates to asset instances, without saving them.
+
+    Parameters:
+        assets(dict): Locked assets by ID.
+        updates(list): Accepted updates, in the order to apply them.
+        now(datetime): Timestamp of the changes.
+    """
+    communities = Communities.objects.in_bulk(
+        {update.community_id for update in updates if update.type == MODIFY})
+    for update in updates:
+        asset = assets.get(update.asset_id)
+        if asset is None:
+            continue
+        if update.type == MODIFY:
+            for field in MODIFIED_FIELDS:
+                setattr(asset, field, getattr(update, field))
+            community = communities[update.community_id]
+            asset.community_geo_id = community.geo_id
+            asset.community_name = community.name
+        elif update.type == DELETE:
+            asset.status = MISSING
+        asset.timestamp = now
@@ -0,0 +1,226 @@
+"""
+This module defines pagination styles for asset listings.
+
+Author: Shashank Shekhar
+"""
+
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class AssetCursorPagination(BasePagination):  # pylint: disable=abstract-method
+    """
+    Keyset (cursor) pagination over assets.
+
+    Rows are ordered by (community_geo_id, id) and each page starts strictly
+    after the last row of the previous one, so deep pages cost the same as
+    the first one, unlike OFFSET. Cursors are opaque, URL safe tokens.
+
+    Attributes:
+        ordering (tuple): Unique ordering the keyset is built on.
+        cursor_query_param (string): Query parameter holding the cursor.
+        page_size_query_param (string): Query parameter for the page size.
+        page_size (int): Default page size.
+        max_page_size (int): Upper bound for a client supplied page size.
+    """
+    ordering = ("community_geo_id", "id")
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self):
+        self.page_size = settings.ASSETS_PAGE_SIZE
+        self.max_page_size = settings.ASSETS_MAX_PAGE_SIZE
+        self.base_url = None
+        self.next_position = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Fetch one page of rows.
+
+        Parameters:
+            queryset(QuerySet): Unordered queryset of assets.
+            request(Request): Client request.
+            view(APIView): Calling view.
+        Returns:
+            page(list): Rows of the requested page.
+        """
+        page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+
+        # Fetch one extra row to know whether a next page exists
+        page = list(queryset[:page_size + 1])
+        if len(page) > page_size:
+            page = page[:page_size]
+            self.next_position = self._get_position(page[-1])
+        else:
+            self.next_position = None
+        return page
+
+    def get_paginated_response(self, data):
+        """
+        Wrap a serialized page.
+
+        Formats serializing a page to an object, like GeoJSON, get the next
+        link as one more member of it.
+
+        Parameters:
+            data(list): Serialized rows.
+        Returns:
+            response(Response): Response with results and the next link.
+        """
+        if isinstance(data, dict):
+            return Response({"next": self.get_next_link(), **data})
+        return Response({
+            "next": self.get_next_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        """Schema of the paginated response"""
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        """Page size requested by the client, capped to the maximum"""
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size)
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_next_link(self):
+        """Absolute URL of the next page, if any"""
+        if self.next_position is None:
+            return None
+        return replace_query_param(self.base_url,
+                                   self.cursor_query_param,
+                                   self.encode_cursor(self.next_position))
+
+    def after(self, position):
+        """
+        Filter on the rows strictly after a keyset position.
+
+        Parameters:
+            position(tuple): Values of the ordering fields.
+        Returns:
+            filter(Q): Rows after the position in ordering order.
+        """
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            equal = dict(zip(self.ordering[:index], position))
+            condition |= Q(**equal, **{f"{field}__gt": position[index]})
+        return condition
+
+    def decode_cursor(self, request):
+        """
+        Decode the cursor of a request.
+
+        Parameters:
+            request(Request): Client request.
+        Returns:
+            position(tuple): Values of the ordering fields, None for the
+                first page.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padding = "=" * (-len(encoded) % 4)
+            position = tuple(int(value) for value in
+                             json.loads(base64.urlsafe_b64decode(encoded + padding)))
+        except (TypeError, ValueError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message) from None
+        if len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    @staticmethod
+    def encode_cursor(position):
+        """Encode a keyset position as an opaque token"""
+        raw = json.dumps(list(position), separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    def _get_position(self, row):
+        """Keyset position of a row - model instance or dictionary"""
+        if isinstance(row, dict):
+            return tuple(row[field] for field in self.ordering)
+        return tuple(getattr(row, field) for field in self.ordering)
+
+
+class AssetSearchPagination(AssetCursorPagination):  # pylint: disable=abstract-method
+    """
+    Page number pagination of ranked search results.
+
+    Ranks are no keyset, so pages are numbered. The total count is never
+    computed, one extra row tells whether a next page exists.
+
+    Attributes:
+        page_query_param (string): Query parameter holding the page number.
+    """
+    page_query_param = "page"
+    invalid_page_message = "Invalid page"
+
+    def __init__(self):
+        super().__init__()
+        self.page_size = settings.ASSETS_SEARCH_PAGE_SIZE
+        self.next_page = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Fetch one page of rows.
+
+        Parameters:
+            queryset(QuerySet): Ordered queryset of assets.
+            request(Request): Client request.
+            view(APIView): Calling view.
+        Returns:
+            page(list): Rows of the requested page.
+        """
+        page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        try:
+            number = _positive_int(request.query_params.get(self.page_query_param, 1),
+                                   strict=True)
+        except ValueError:
+            raise NotFound(self.invalid_page_message) from None
+
+        offset = (number - 1) * page_size
+        page = list(queryset[offset:offset + page_size + 1])
+        self.next_page = number + 1 if len(page) > page_size else None
+        return page[:page_size]
+
+    def get_next_link(self):
+        """Absolute URL of the next page, if any"""
+        if self.next_page is None:
+            return None
+        return replace_query_param(self.base_url, self.page_query_param,
+                                   self.next_page)
+
+
+class AssetUpdateCursorPagination(AssetCursorPagination):  # pylint: disable=abstract-method
+    """
+    Keyset (cursor) pagination over asset updates, oldest first.
+    """
+    ordering = ("id",)
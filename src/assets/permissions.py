@@ -0,0 +1,34 @@
+"""
+This module defines the permissions of asset views.
+
+Users are built from their token claims, see user.authentication, so
+permissions are checked without querying their profile.
+
+Author: Shashank Shekhar
+"""
+
+from rest_framework.permissions import BasePermission
+
+from user.models import Profiles
+
+
+class IsPlanner(BasePermission):
+    """
+    Allows authenticated planners, who moderate the assets of their
+    community.
+    """
+    message = "Only planners may moderate asset updates."
+
+    def has_permission(self, request, view):
+        """
+        Check the profile type claim of the requesting user.
+
+        Parameters:
+            request(HttpRequest): User requests.
+            view(APIView): Requested view.
+        Returns:
+            allowed(bool): True for authenticated planners.
+        """
+        user = request.user
+        return bool(user and user.is_authenticated and
+                    getattr(user, "profile_type", None) == Profiles.PLANNER_TYPE)
@@ -0,0 +1,49 @@
+"""
+This module defines the response formats of the assets API.
+
+Author: Shashank Shekhar
+"""
+
+import msgpack
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+class GeoJSONRenderer(JSONRenderer):
+    """
+    GeoJSON renderer, for data serialized by GeoJSONAssetSerializer.
+    """
+    media_type = "application/geo+json"
+    format = "geojson"
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    """
+    Columnar JSON renderer, for data serialized by ColumnarAssetSerializer.
+    """
+    media_type = "application/vnd.assetmappr.columnar+json"
+    format = "columnar"
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    MessagePack renderer, for data serialized by ColumnarAssetSerializer.
+    """
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render data into MessagePack.
+
+        Parameters:
+            data(object): Serialized data.
+            accepted_media_type(string): Negotiated media type.
+            renderer_context(dict): View, request and response.
+        Returns:
+            rendered(bytes): MessagePack encoded data.
+        """
+        if data is None:
+            return b""
+        return msgpack.packb(data, use_bin_type=True)
@@ -0,0 +1,32 @@
+"""
+This module implements full-text search over assets.
+
+Assets carry a search_vector column kept up to date by a database trigger,
+with the name weighted above the address and the address above the
+description.
+
+Author: Shashank Shekhar
+"""
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F
+
+# Text search configuration of the assets_search_vector_update trigger
+SEARCH_CONFIG = "english"
+
+
+def search_assets(queryset, text):
+    """
+    Filter assets matching a search and order them by relevance.
+
+    Parameters:
+        queryset(QuerySet): Assets to search.
+        text(string): Web search style query - words, "quoted phrases",
+            or and -excluded words.
+    Returns:
+        data(QuerySet): Matching assets, most relevant first.
+    """
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type="websearch")
+    return queryset.filter(search_vector=query) \
+        .alias(rank=SearchRank(F("search_vector"), query)) \
+        .order_by("-rank", "id")
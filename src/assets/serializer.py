@@ -4,8 +4,11 @@ This module defines Serilaizers.
 Author: Shashank Shekhar
 """
 
+import decimal
+
+from django.conf import settings
 from rest_framework import serializers
-from .models import Assets
+from .models import AssetRatings, AssetUpdates, Assets, Categories, Sources
 
 
 class AssetSerializer(serializers.ModelSerializer):
@@ -33,3 +36,461 @@ class AssetSerializer(serializers.ModelSerializer):
                   "address",
                   "timestamp",
                   "status")
+
+
+class AssetUpdateSerializer(serializers.ModelSerializer):
+    """
+    Asset Update Serializer.
+    """
+    class Meta:
+        """
+        Meta Info for class.
+        """
+        model = AssetUpdates
+        fields = ("id",
+                  "asset_id",
+                  "name",
+                  "community_id",
+                  "category_id",
+                  "description",
+                  "website",
+                  "latitude",
+                  "longitude",
+                  "address",
+                  "timestamp",
+                  "type",
+                  "status")
+
+
+class ModerationSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """
+    Moderation decisions on asset updates.
+    """
+    accept = serializers.ListField(child=serializers.IntegerField(),
+                                   default=list, max_length=1000)
+    reject = serializers.ListField(child=serializers.IntegerField(),
+                                   default=list, max_length=1000)
+
+    def validate(self, attrs):
+        """Check that no update is both accepted and rejected"""
+        both = set(attrs["accept"]) & set(attrs["reject"])
+        if both:
+            raise serializers.ValidationError(
+                f"Updates both accepted and rejected: {sorted(both)}")
+        return attrs
+
+
+class BatchAssetSerializer(serializers.ModelSerializer):
+    """
+    Asset suggestion of a batch, created with the Suggestion status.
+    References are checked in bulk by apply_batch(), so they are plain
+    integers here. The user is the one authenticated, never the body's.
+    """
+    community_id = serializers.IntegerField()
+    source_id = serializers.IntegerField()
+    category_id = serializers.IntegerField()
+
+    class Meta:
+        """
+        Meta Info for class.
+        """
+        model = Assets
+        fields = ("name",
+                  "type",
+                  "community_id",
+                  "source_id",
+                  "category_id",
+                  "description",
+                  "website",
+                  "latitude",
+                  "longitude",
+                  "address")
+
+
+class BatchReferenceSerializer(serializers.ModelSerializer):  # pylint: disable=abstract-method
+    """
+    Base of batch items about an asset - an existing one by asset_id, or
+    one suggested earlier in the batch by asset_ref, its item index.
+    """
+    asset_id = serializers.IntegerField(required=False)
+    asset_ref = serializers.IntegerField(required=False, min_value=0)
+
+    def validate(self, attrs):
+        """Check that exactly one of asset_id and asset_ref is given"""
+        if ("asset_id" in attrs) == ("asset_ref" in attrs):
+            raise serializers.ValidationError(
+                "Expected exactly one of asset_id and asset_ref.")
+        return attrs
+
+
+class BatchAssetUpdateSerializer(BatchReferenceSerializer):
+    """
+    Asset update of a batch, created under review.
+    """
+    community_id = serializers.IntegerField()
+    category_id = serializers.IntegerField()
+    type = serializers.ChoiceField(choices=[0, 1])
+
+    class Meta:
+        """
+        Meta Info for class.
+        """
+        model = AssetUpdates
+        fields = ("asset_id",
+                  "asset_ref",
+                  "name",
+                  "community_id",
+                  "category_id",
+                  "description",
+                  "website",
+                  "latitude",
+                  "longitude",
+                  "address",
+                  "type")
+
+
+class BatchAssetRatingSerializer(BatchReferenceSerializer):
+    """
+    Asset rating of a batch.
+    """
+    community_id = serializers.IntegerField()
+    value_id = serializers.IntegerField()
+
+    class Meta:
+        """
+        Meta Info for class.
+        """
+        model = AssetRatings
+        fields = ("asset_id",
+                  "asset_ref",
+                  "community_id",
+                  "rating_scale",
+                  "comment",
+                  "value_id")
+
+
+class BatchSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """
+    Batch of offline collected items, each {"kind": ..., "data": {...}}.
+    Item data is validated by apply_batch(), item by item.
+    """
+    items = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+
+    def validate_items(self, items):
+        """Check the batch size"""
+        if len(items) > settings.ASSETS_BATCH_MAX_ITEMS:
+            raise serializers.ValidationError(
+                f"Expected up to {settings.ASSETS_BATCH_MAX_ITEMS} items.")
+        return items
+
+
+def _decimal_converter(field):
+    """
+    Precompile a DecimalField's representation.
+
+    Parameters:
+        field(DecimalField): DRF field to mirror.
+    Returns:
+        convert(callable): Decimal to fixed point string, as DRF renders it.
+    """
+    quantum = decimal.Decimal(".1") ** field.decimal_places
+    context = decimal.getcontext().copy()
+    context.prec = field.max_digits
+    rounding = field.rounding
+
+    def convert(value):
+        if value is None:
+            return None
+        return f"{value.quantize(quantum, rounding=rounding, context=context):f}"
+    return convert
+
+
+def _datetime_converter(field):
+    """
+    Precompile a DateTimeField's representation.
+
+    Parameters:
+        field(DateTimeField): DRF field to mirror.
+    Returns:
+        convert(callable): Datetime to ISO 8601 string, as DRF renders it.
+    """
+    field_timezone = field.default_timezone()
+
+    def convert(value):
+        if not value:
+            return None
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+    return convert
+
+
+def _float_converter(field):  # pylint: disable=unused-argument
+    """
+    Precompile a DecimalField's representation as a native number.
+
+    Parameters:
+        field(DecimalField): DRF field to mirror.
+    Returns:
+        convert(callable): Decimal to float.
+    """
+    def convert(value):
+        if value is None:
+            return None
+        return float(value)
+    return convert
+
+
+class FastAssetSerializer:
+    """
+    Read-only asset serializer over values_list() rows.
+
+    Skips model instantiation and per-field DRF dispatch. Its output is the
+    same as AssetSerializer's for the same rows.
+
+    Attributes:
+        fields (tuple): Serialized fields, shared with AssetSerializer.
+            Instances may serialize a subset of them.
+        required_fields (tuple): Fields serialized even if not requested -
+            the pagination keys.
+        converter_factories (dict): Converter factory by DRF field type.
+            Fields of other types are serialized as is.
+        expansions (dict): Selected fields of the related data that can be
+            embedded, by name. expand_<name>() serializes them.
+    """
+    fields = AssetSerializer.Meta.fields
+    required_fields = ("id", "community_geo_id")
+    converter_factories = {
+        serializers.DecimalField: _decimal_converter,
+        serializers.DateTimeField: _datetime_converter,
+    }
+    expansions = {
+        "category": ("category__id", "category__category"),
+        "source": ("source__id", "source__name"),
+        "community": ("community__id", "community__geo_id", "community__name"),
+        "ratings": ("rating_summary__count",
+                    "rating_summary__weight_sum",
+                    "rating_summary__histogram",
+                    "rating_summary__last_rated"),
+    }
+
+    def __init__(self, instance=None, many=False, expand=(), fields=None):
+        self.instance = instance
+        self.many = many
+        self.expand = tuple(expand)
+        self.fields = self.selected_fields(fields)
+        self.convert_datetime = _datetime_converter(serializers.DateTimeField())
+        converters = self.converter_factories
+        declared = AssetSerializer().fields
+        self.converters = tuple(
+            converters[type(declared[name])](declared[name])
+            if type(declared[name]) in converters else None
+            for name in self.fields)
+
+    @classmethod
+    def selected_fields(cls, fields=None):
+        """
+        Fields to serialize, in the order of fields.
+
+        Parameters:
+            fields(iterable): Requested fields, None for all of them.
+        Returns:
+            fields(tuple): Requested and required fields.
+        """
+        if fields is None:
+            return cls.fields
+        selected = {*fields, *cls.required_fields}
+        return tuple(name for name in cls.fields if name in selected)
+
+    @classmethod
+    def rows(cls, queryset, expand=(), fields=None):
+        """
+        Select only the serialized columns of a queryset.
+
+        Related data to embed is joined in the same query, and columns of
+        fields not requested are never read.
+
+        Parameters:
+            queryset(QuerySet): Assets queryset.
+            expand(iterable): Names of the expansions to embed.
+            fields(iterable): Requested fields, None for all of them.
+        Returns:
+            rows(QuerySet): Named tuples in the order of fields, followed
+                by the fields of each expansion.
+        """
+        expanded = [field for name in expand for field in cls.expansions[name]]
+        return queryset.values_list(*cls.selected_fields(fields), *expanded, named=True)
+
+    def to_representation(self, row):
+        """
+        Serialize one row.
+
+        Parameters:
+            row(tuple): Row from rows().
+        Returns:
+            data(dict): Serialized asset.
+        """
+        data = {name: value if convert is None else convert(value)
+                for name, convert, value in zip(self.fields, self.converters, row)}
+        start = len(self.fields)
+        for name in self.expand:
+            end = start + len(self.expansions[name])
+            data[name] = getattr(self, f"expand_{name}")(*row[start:end])
+            start = end
+        return data
+
+    @staticmethod
+    def expand_category(category_id, name):
+        """Serialize the category of an asset"""
+        return {"id": category_id, "name": name}
+
+    @staticmethod
+    def expand_source(source_id, name):
+        """Serialize the source of an asset"""
+        return {"id": source_id, "name": name}
+
+    @staticmethod
+    def expand_community(community_id, geo_id, name):
+        """Serialize the community of an asset"""
+        return {"id": community_id, "geo_id": geo_id, "name": name}
+
+    def expand_ratings(self, count, weight_sum, histogram, last_rated):
+        """Serialize the rating summary of an asset - empty if never rated"""
+        return {"count": count or 0,
+                "score": weight_sum / count if count else None,
+                "histogram": histogram or {},
+                "last_rated": self.convert_datetime(last_rated)}
+
+    @property
+    def data(self):
+        """Serialized row, or list of rows if many"""
+        if self.many:
+            return [self.to_representation(row) for row in self.instance]
+        return self.to_representation(self.instance)
+
+
+class GeoJSONAssetSerializer(FastAssetSerializer):
+    """
+    Read-only asset serializer to GeoJSON features.
+
+    Each asset is a Point feature with numeric coordinates, and its other
+    fields as properties. A list of assets is a FeatureCollection.
+    """
+    required_fields = (*FastAssetSerializer.required_fields, "latitude", "longitude")
+    converter_factories = {
+        **FastAssetSerializer.converter_factories,
+        serializers.DecimalField: _float_converter,
+    }
+
+    def to_representation(self, row):
+        """
+        Serialize one row.
+
+        Parameters:
+            row(tuple): Row from rows().
+        Returns:
+            data(dict): GeoJSON feature.
+        """
+        properties = super().to_representation(row)
+        longitude = properties.pop("longitude")
+        latitude = properties.pop("latitude")
+        return {"type": "Feature",
+                "id": properties["id"],
+                "geometry": {"type": "Point",
+                             "coordinates": [longitude, latitude]},
+                "properties": properties}
+
+    @property
+    def data(self):
+        """Feature, or FeatureCollection if many"""
+        if self.many:
+            return {"type": "FeatureCollection",
+                    "features": [self.to_representation(row)
+                                 for row in self.instance]}
+        return self.to_representation(self.instance)
+
+
+class ColumnarAssetSerializer(FastAssetSerializer):
+    """
+    Read-only asset serializer to a compact columnar format.
+
+    Assets are sent as one array per field. Communities, sources and
+    categories are sent once in lookup tables, and the community, source
+    and category columns hold indexes into them:
+
+        {"count": 2,
+         "lookups": {"communities": [{"id": 1, "geo_id": 4250408,
+                                      "name": "Monongahela"}],
+                     "sources": [{"id": 1, "name": "Google"}],
+                     "categories": [{"id": 3, "name": "Parks"}]},
+         "columns": {"id": [10, 11], "community": [0, 0], ...}}
+
+    Attributes:
+        lookups (dict): Lookup table and indexed column by the fields they
+            replace. community_geo_id and community_name are part of the
+            communities table.
+    """
+    required_fields = (*FastAssetSerializer.required_fields,
+                       "community_name", "community_id")
+    converter_factories = GeoJSONAssetSerializer.converter_factories
+    # The lookup tables already name categories, sources and communities
+    expansions = {"ratings": FastAssetSerializer.expansions["ratings"]}
+    lookups = {
+        "community_id": ("communities", "community"),
+        "source_id": ("sources", "source"),
+        "category_id": ("categories", "category"),
+    }
+
+    @property
+    def data(self):
+        """Columns and lookup tables of the rows"""
+        rows = self.instance if self.many else [self.instance]
+        replaced = ("community_geo_id", "community_name")
+        columns = {self.lookups[name][1] if name in self.lookups else name: []
+                   for name in (*self.fields, *self.expand) if name not in replaced}
+        indexes = {table: {} for table, _ in self.lookups.values()}
+        communities = {}
+        count = 0
+        for row in rows:
+            count += 1
+            asset = self.to_representation(row)
+            communities.setdefault(asset["community_id"],
+                                   (asset["community_geo_id"], asset["community_name"]))
+            for name, value in asset.items():
+                if name in self.lookups:
+                    table, column = self.lookups[name]
+                    index = indexes[table]
+                    columns[column].append(
+                        None if value is None else index.setdefault(value, len(index)))
+                elif name not in replaced:
+                    columns[name].append(value)
+        return {"count": count,
+                "lookups": lookup_tables(indexes, communities),
+                "columns": columns}
+
+
+def lookup_tables(indexes, communities):
+    """
+    Build the lookup tables of the columnar format.
+
+    Parameters:
+        indexes(dict): Index by ID, by table.
+        communities(dict): (geo_id, name) by community ID.
+    Returns:
+        lookups(dict): Lookup tables, in index order.
+    """
+    categories = dict(Categories.objects.filter(id__in=indexes["categories"])
+                      .values_list("id", "category"))
+    sources = dict(Sources.objects.filter(id__in=indexes["sources"])
+                   .values_list("id", "name"))
+    return {
+        "communities": [{"id": pk,
+                         "geo_id": communities[pk][0],
+                         "name": communities[pk][1]}
+                        for pk in indexes["communities"]],
+        "sources": [{"id": pk, "name": sources.get(pk)}
+                    for pk in indexes["sources"]],
+        "categories": [{"id": pk, "name": categories.get(pk)}
+                       for pk in indexes["categories"]],
+    }
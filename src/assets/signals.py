@@ -0,0 +1,159 @@
+"""
+This module keeps derived asset data in sync with writes.
+
+Author: Shashank Shekhar
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from .models import AssetClusters, AssetRatingSummaries, AssetRatings, \
+    AssetTombstones, Assets, CommunityVersions
+from .snapshots import snapshot_publisher
+
+# Sent with community_geo_ids after assets of those communities changed.
+# Bulk writes bypass post_save/post_delete and must call notify_assets_changed.
+assets_changed = Signal()
+
+# Fields whose previous values decide what derived data a save changes
+TRACKED_FIELDS = ("community_geo_id", "status", "latitude", "longitude",
+                  "category_id")
+
+
+def notify_assets_changed(community_geo_ids):
+    """
+    Announce that assets of some communities changed.
+
+    Parameters:
+        community_geo_ids(iterable): Geo IDs of the changed communities.
+    """
+    assets_changed.send(sender=Assets,
+                        community_geo_ids=frozenset(community_geo_ids))
+
+
+def cluster_point(values):
+    """
+    Point an asset contributes to the cluster aggregates.
+
+    Parameters:
+        values(dict): Tracked field values of the asset.
+    Returns:
+        point(tuple): (latitude, longitude, category_id), None if not valid.
+    """
+    if values.get("status") != 0:
+        return None
+    return values["latitude"], values["longitude"], values["category_id"]
+
+
+def leave_moved_tombstones(moves):
+    """
+    Leave tombstones of assets in the communities they moved out of, so
+    clients syncing those communities remove them.
+
+    Parameters:
+        moves(iterable): (asset_id, previous, current community geo ID).
+    """
+    AssetTombstones.objects.bulk_create([
+        AssetTombstones(asset_id=asset_id, community_geo_id=previous)
+        for asset_id, previous, current in moves if previous != current])
+
+
+@receiver(pre_save, sender=Assets)
+def asset_saving(sender, instance, raw, **kwargs):  # pylint: disable=unused-argument
+    """Load the stored values a save will overwrite, if not known yet"""
+    if raw or instance.pk is None:
+        return
+    loaded_values = getattr(instance, "_loaded_values", {})
+    if all(field in loaded_values for field in TRACKED_FIELDS):
+        return
+    stored = Assets.objects.filter(pk=instance.pk).values(*TRACKED_FIELDS).first()
+    instance._loaded_values = {**loaded_values, **(stored or {})}  # pylint: disable=protected-access
+
+
+@receiver(post_save, sender=Assets)
+def asset_saved(sender, instance, raw, **kwargs):  # pylint: disable=unused-argument
+    """Update clusters and notify the communities an asset was saved in or moved from"""
+    before = getattr(instance, "_loaded_values", {})
+    after = {field: getattr(instance, field) for field in TRACKED_FIELDS}
+    if not raw:
+        removed, added = cluster_point(before), cluster_point(after)
+        if removed != added:
+            AssetClusters.objects.apply_changes(
+                removed=[removed] if removed else [],
+                added=[added] if added else [])
+
+    community_geo_ids = {after["community_geo_id"]}
+    if "community_geo_id" in before:
+        community_geo_ids.add(before["community_geo_id"])
+        if not raw:
+            leave_moved_tombstones([(instance.pk, before["community_geo_id"],
+                                     after["community_geo_id"])])
+    notify_assets_changed(community_geo_ids)
+    # The saved values are the ones a next save overwrites
+    instance._loaded_values = {**before, **after}  # pylint: disable=protected-access
+
+
+@receiver(post_delete, sender=Assets)
+def asset_deleted(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Update clusters, leave a tombstone and notify the community of a deleted asset"""
+    point = cluster_point({field: getattr(instance, field)
+                           for field in TRACKED_FIELDS})
+    if point:
+        AssetClusters.objects.apply_changes(removed=[point])
+    AssetTombstones.objects.create(asset_id=instance.pk,
+                                   community_geo_id=instance.community_geo_id)
+    notify_assets_changed({instance.community_geo_id})
+
+
+def notify_ratings_changed(asset_ids):
+    """Notify the communities of assets whose rating summary changed"""
+    notify_assets_changed(Assets.objects.filter(pk__in=asset_ids)
+                          .values_list("community_geo_id", flat=True))
+
+
+@receiver(pre_save, sender=AssetRatings)
+def rating_saving(sender, instance, raw, **kwargs):  # pylint: disable=unused-argument
+    """Load the rated asset and value a save will overwrite"""
+    if raw or instance.pk is None:
+        return
+    stored = AssetRatings.objects.filter(pk=instance.pk) \
+        .values("asset_id", "value_id").first()
+    instance._loaded_values = stored or {}  # pylint: disable=protected-access
+
+
+@receiver(post_save, sender=AssetRatings)
+def rating_saved(sender, instance, raw, **kwargs):  # pylint: disable=unused-argument
+    """Move a saved rating in the rating summaries"""
+    if raw:
+        return
+    before = getattr(instance, "_loaded_values", {})
+    after = {"asset_id": instance.asset_id, "value_id": instance.value_id}
+    changes = [(after["asset_id"], after["value_id"], 1, instance.timestamp)]
+    if before:
+        changes.append((before["asset_id"], before["value_id"], -1, None))
+    AssetRatingSummaries.objects.apply_changes(changes)
+    notify_ratings_changed({after["asset_id"], before.get("asset_id")} - {None})
+    instance._loaded_values = after  # pylint: disable=protected-access
+
+
+@receiver(post_delete, sender=AssetRatings)
+def rating_deleted(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Remove a deleted rating from the rating summaries"""
+    AssetRatingSummaries.objects.apply_changes(
+        [(instance.asset_id, instance.value_id, -1, None)])
+    notify_ratings_changed({instance.asset_id})
+
+
+@receiver(assets_changed)
+def bump_versions(sender, community_geo_ids, **kwargs):  # pylint: disable=unused-argument
+    """Invalidate cached payloads of changed communities"""
+    CommunityVersions.objects.bump(community_geo_ids)
+
+
+@receiver(assets_changed)
+def republish_snapshots(sender, community_geo_ids, **kwargs):  # pylint: disable=unused-argument
+    """Queue the static snapshots of changed communities once committed"""
+    if settings.ASSETS_SNAPSHOT_DIR:
+        transaction.on_commit(lambda: snapshot_publisher().schedule(community_geo_ids))
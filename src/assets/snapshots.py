@@ -0,0 +1,205 @@
+"""
+This module publishes static snapshots of community asset listings.
+
+A snapshot is the body of get_assets?com_geo_id=N&paginate=false in
+<ASSETS_SNAPSHOT_DIR>/N.json, with a gzipped copy next to it. Nginx
+serves them without reaching Django, so snapshots are rewritten whenever
+assets of their community change, and removed if that fails so requests
+fall back to Django rather than getting a stale listing.
+
+Snapshots are rendered by a background thread of each process, off the
+request path. Changes to a community queued while it is rendered are
+coalesced into one more render. A snapshot is only written if its
+community version is still the one it was rendered at, so a slower
+publisher never replaces a newer snapshot with an older one.
+
+Author: Shashank Shekhar
+"""
+
+import functools
+import gzip
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+
+from .models import Assets, CommunityVersions
+from .serializer import FastAssetSerializer
+from .streaming import encode
+
+logger = logging.getLogger(__name__)
+
+# Prefix of the advisory lock keys held while replacing a snapshot
+LOCK_PREFIX = "assets.snapshot"
+
+
+def snapshot_paths(community_geo_id):
+    """
+    Files of the snapshot of a community.
+
+    Parameters:
+        community_geo_id(int): Community geo ID.
+    Returns:
+        paths(tuple): JSON and gzipped JSON paths.
+    """
+    path = os.path.join(settings.ASSETS_SNAPSHOT_DIR, f"{int(community_geo_id)}.json")
+    return path, f"{path}.gz"
+
+
+def render_snapshot(community_geo_id):
+    """
+    Render the whole listing of a community as get_assets would.
+
+    Parameters:
+        community_geo_id(int): Community geo ID.
+    Returns:
+        content(bytes): JSON listing.
+    """
+    valid = Assets.objects.filter(status__exact=0,
+                                  community_geo_id__exact=community_geo_id)
+    rows = FastAssetSerializer.rows(valid.order_by("id"))
+    return encode(FastAssetSerializer(rows, many=True).data)
+
+
+def write_atomic(path, content):
+    """
+    Replace a file so readers see either the old or the new content.
+
+    Parameters:
+        path(string): File path.
+        content(bytes): New content.
+    """
+    directory = os.path.dirname(path)
+    descriptor, temporary = tempfile.mkstemp(dir=directory, prefix=".snapshot")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(content)
+        # mkstemp creates files only the owner can read, nginx is not it
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def publish_snapshot(community_geo_id):
+    """
+    Write the snapshot of a community, unless its assets changed meanwhile.
+
+    The community version is read before rendering, and checked again
+    under a per-community advisory lock before the files are replaced. A
+    changed version means a newer snapshot is being published, by the
+    change that bumped it.
+
+    Parameters:
+        community_geo_id(int): Community geo ID.
+    Returns:
+        published(bool): Whether the snapshot was written.
+    """
+    path, gzip_path = snapshot_paths(community_geo_id)
+    version = CommunityVersions.objects.current(community_geo_id)
+    content = render_snapshot(community_geo_id)
+    compressed = gzip.compress(content, compresslevel=9, mtime=0)
+    os.makedirs(settings.ASSETS_SNAPSHOT_DIR, exist_ok=True)
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))",
+                           [f"{LOCK_PREFIX}:{int(community_geo_id)}"])
+        if CommunityVersions.objects.current(community_geo_id) != version:
+            return False
+        write_atomic(gzip_path, compressed)
+        write_atomic(path, content)
+    return True
+
+
+def remove_snapshot(community_geo_id):
+    """
+    Remove the snapshot of a community, nginx then falls back to Django.
+
+    Parameters:
+        community_geo_id(int): Community geo ID.
+    """
+    for path in snapshot_paths(community_geo_id):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def publish_snapshots(community_geo_ids):
+    """
+    Rewrite the snapshots of communities, if snapshots are enabled.
+
+    A snapshot that can't be rewritten is removed instead.
+
+    Parameters:
+        community_geo_ids(iterable): Community geo IDs.
+    """
+    if not settings.ASSETS_SNAPSHOT_DIR:
+        return
+    for community_geo_id in sorted(community_geo_ids):
+        try:
+            publish_snapshot(community_geo_id)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Snapshot of community %s not published",
+                             community_geo_id)
+            remove_snapshot(community_geo_id)
+
+
+class SnapshotPublisher:
+    """
+    Publishes snapshots in one background thread.
+
+    Communities scheduled while snapshots are rendered are published by
+    the next round, once however many times they were scheduled.
+
+    Attributes:
+        lock (Lock): Guards pending and running.
+        pending (set): Geo IDs of the communities to publish next.
+        running (bool): Whether the thread is publishing.
+        executor (ThreadPoolExecutor): The publishing thread.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = set()
+        self.running = False
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix="snapshots")
+
+    def schedule(self, community_geo_ids):
+        """
+        Queue communities to publish, without waiting.
+
+        Parameters:
+            community_geo_ids(iterable): Community geo IDs.
+        """
+        with self.lock:
+            self.pending.update(community_geo_ids)
+            if self.running or not self.pending:
+                return
+            self.running = True
+        self.executor.submit(self.drain)
+
+    def drain(self):
+        """Publish pending communities until none are left"""
+        try:
+            while True:
+                with self.lock:
+                    community_geo_ids, self.pending = self.pending, set()
+                    if not community_geo_ids:
+                        self.running = False
+                        return
+                publish_snapshots(community_geo_ids)
+        finally:
+            # The thread outlives requests, whose end closes connections
+            connections.close_all()
+
+
+@functools.lru_cache(maxsize=None)
+def snapshot_publisher():
+    """Publisher of this process"""
+    return SnapshotPublisher()
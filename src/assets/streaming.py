@@ -0,0 +1,117 @@
+"""
+This module streams large JSON listings.
+
+Author: Shashank Shekhar
+"""
+
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+# Same options as DRF's JSONRenderer so streamed and rendered bodies match
+ENCODER = JSONEncoder(ensure_ascii=JSONRenderer.ensure_ascii,
+                      allow_nan=not JSONRenderer.strict,
+                      separators=(",", ":"))
+
+
+def encode(data):
+    """
+    Encode data exactly as JSONRenderer would.
+
+    Parameters:
+        data(object): JSON serializable data.
+    Returns:
+        encoded(bytes): UTF-8 encoded JSON.
+    """
+    ret = ENCODER.encode(data)
+    # JSONRenderer escapes the unicode line and paragraph separators
+    ret = ret.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029")
+    return ret.encode()
+
+
+def iter_json_list(rows, to_representation, batch_size):
+    """
+    Encode rows as a JSON array, a batch at a time.
+
+    Parameters:
+        rows(iterable): Rows to encode, read lazily.
+        to_representation(callable): Converts a row to JSON serializable data.
+        batch_size(int): Number of rows per yielded chunk.
+    Yields:
+        chunk(bytes): Part of the JSON array.
+    """
+    yield b"["
+    batch = []
+    separator = b""
+    for row in rows:
+        batch.append(encode(to_representation(row)))
+        if len(batch) >= batch_size:
+            yield separator + b",".join(batch)
+            separator = b","
+            batch = []
+    if batch:
+        yield separator + b",".join(batch)
+    yield b"]"
+
+
+def streaming_json_response(queryset, to_representation, chunk_size):
+    """
+    Stream a queryset as a JSON array.
+
+    The queryset is walked with a server-side cursor, so only one chunk of
+    rows is held in memory however large the result is.
+
+    Parameters:
+        queryset(QuerySet): Rows to stream.
+        to_representation(callable): Converts a row to JSON serializable data.
+        chunk_size(int): Rows fetched from the database cursor at a time.
+    Returns:
+        response(StreamingHttpResponse): Streaming JSON response.
+    """
+    rows = queryset.iterator(chunk_size=chunk_size)
+    return StreamingHttpResponse(
+        iter_json_list(rows, to_representation, chunk_size),
+        content_type="application/json")
+
+
+async def aiter_json_list(rows, to_representation, batch_size):
+    """
+    Encode rows read with the async ORM as a JSON array, a batch at a time.
+
+    Parameters:
+        rows(async iterable): Rows to encode, read lazily.
+        to_representation(callable): Converts a row to JSON serializable data.
+        batch_size(int): Number of rows per yielded chunk.
+    Yields:
+        chunk(bytes): Part of the JSON array.
+    """
+    yield b"["
+    batch = []
+    separator = b""
+    async for row in rows:
+        batch.append(encode(to_representation(row)))
+        if len(batch) >= batch_size:
+            yield separator + b",".join(batch)
+            separator = b","
+            batch = []
+    if batch:
+        yield separator + b",".join(batch)
+    yield b"]"
+
+
+def async_streaming_json_response(queryset, to_representation, chunk_size):
+    """
+    Stream a queryset as a JSON array from an async view.
+
+    Parameters:
+        queryset(QuerySet): Rows to stream.
+        to_representation(callable): Converts a row to JSON serializable data.
+        chunk_size(int): Rows fetched from the database cursor at a time.
+    Returns:
+        response(StreamingHttpResponse): Streaming JSON response.
+    """
+    rows = queryset.aiterator(chunk_size=chunk_size)
+    return StreamingHttpResponse(
+        aiter_json_list(rows, to_representation, chunk_size),
+        content_type="application/json")
@@ -1,8 +1,654 @@
 """
 This module includes tests.
 
-Author:
+Author: Shashank Shekhar
 """
-# from django.test import TestCase
+import datetime
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import brotli
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+from user.models import Profiles, Users
+from user.tokens import ProfileRefreshToken
+
+from . import snapshots
+from .compression import CompressedPayload
+from .models import AssetClusters, AssetRatingSummaries, AssetRatings, \
+    AssetTombstones, AssetUpdates, Assets, Categories, Communities, RatingValues, \
+    Sources
+
+
+class AssetTestCase(TestCase):
+    """
+    Test case with a community, a source and a category to create assets in.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.community = Communities.objects.create(geo_id=4250408,
+                                                   name="Monongahela",
+                                                   latitude=Decimal("40.19"),
+                                                   longitude=Decimal("-79.92"))
+        cls.source = Sources.objects.create(name="Google")
+        cls.category = Categories.objects.create(category="Parks")
+
+    def create_asset(self, **fields):
+        """
+        Create a valid asset in the test community, with the model signals.
+
+        Parameters:
+            fields(dict): Fields overriding the defaults.
+        Returns:
+            asset(Assets): Created asset.
+        """
+        values = {"name": "Asset",
+                  "type": 0,
+                  "community": self.community,
+                  "community_geo_id": self.community.geo_id,
+                  "community_name": self.community.name,
+                  "source": self.source,
+                  "category": self.category,
+                  "latitude": Decimal("40.19"),
+                  "longitude": Decimal("-79.92"),
+                  "status": 0}
+        values.update(fields)
+        return Assets.objects.create(**values)
+
+
+class AssetListQueriesTest(AssetTestCase):
+    """
+    get_assets runs the same queries whatever the number of assets.
+    """
+
+    def create_assets(self, count):
+        """Create valid assets in the test community"""
+        Assets.objects.bulk_create(
+            Assets(name=f"Asset {number}",
+                   type=0,
+                   community=self.community,
+                   community_geo_id=self.community.geo_id,
+                   community_name=self.community.name,
+                   source=self.source,
+                   category=self.category,
+                   latitude=Decimal("40.19"),
+                   longitude=Decimal("-79.92"),
+                   status=0)
+            for number in range(count))
+
+    def count_queries(self, query):
+        """
+        Request get_assets and count the database queries.
+
+        Parameters:
+            query(string): Query string.
+        Returns:
+            queries(int): Number of queries.
+            results(list): Serialized assets.
+        """
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(f"{reverse('asset-list')}?{query}")
+        self.assertEqual(response.status_code, 200)
+        return len(context), response.json()
+
+    def assert_constant_queries(self, query):
+        """Check that listing 1 or 50 assets runs as many queries"""
+        self.create_assets(1)
+        few, results = self.count_queries(query)
+        self.assertEqual(len(results), 1)
+        self.create_assets(49)
+        many, results = self.count_queries(query)
+        self.assertEqual(len(results), 50)
+        self.assertEqual(few, many)
+        return results
+
+    def test_expand(self):
+        """Expanded related data is joined in the listing query"""
+        results = self.assert_constant_queries(
+            "paginate=false&expand=category,source,community,ratings")
+        self.assertEqual(results[0]["category"],
+                         {"id": self.category.id, "name": "Parks"})
+        self.assertEqual(results[0]["source"],
+                         {"id": self.source.id, "name": "Google"})
+        self.assertEqual(results[0]["community"],
+                         {"id": self.community.id, "geo_id": 4250408,
+                          "name": "Monongahela"})
+        self.assertEqual(results[0]["ratings"]["count"], 0)
+
+    def test_fields(self):
+        """Sparse fields keep the pagination keys and skip other columns"""
+        self.create_assets(1)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                f"{reverse('asset-list')}?paginate=false&fields=name,category_id")
+        self.assertEqual(set(response.json()[0]),
+                         {"id", "community_geo_id", "name", "category_id"})
+        self.assertNotIn('"description"', context.captured_queries[-1]["sql"])
+
+    def test_invalid_options(self):
+        """Unknown expansions and fields are rejected"""
+        for query in ("expand=user", "fields=password"):
+            response = self.client.get(f"{reverse('asset-list')}?{query}")
+            self.assertEqual(response.status_code, 400)
+
+
+
+
+class AssetETagTest(AssetTestCase):
+    """
+    Listings have an ETag of their community's data version.
+    """
+
+    def get(self, query, etag=None):
+        """Request get_assets, conditionally if an ETag is given"""
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        return self.client.get(f"{reverse('asset-list')}?{query}", **headers)
+
+    def test_not_modified(self):
+        """A matching If-None-Match gets a 304 until a write"""
+        self.create_asset()
+        etags = {query: self.get(query)["ETag"] for query in
+                 (f"com_geo_id={self.community.geo_id}&paginate=false",
+                  "paginate=false")}
+        for query, etag in etags.items():
+            response = self.get(query, etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b"")
+
+        self.create_asset()
+        for query, etag in etags.items():
+            response = self.get(query, etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response["ETag"], etag)
+
+
+
+class CompressedListingTest(AssetTestCase):
+    """
+    Whole community listings are compressed once per data version.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, encoding):
+        """Request the listing of the test community"""
+        return self.client.get(f"{reverse('asset-list')}"
+                               f"?com_geo_id={self.community.geo_id}&paginate=false",
+                               HTTP_ACCEPT_ENCODING=encoding)
+
+    def test_cached(self):
+        """Compressed listings are served from the cache until a write"""
+        self.create_asset()
+        identity = self.get("identity").content
+        for encoding, decompress in (("br", brotli.decompress),
+                                     ("gzip", gzip.decompress)):
+            response = self.get(encoding)
+            self.assertEqual(response["Content-Encoding"], encoding)
+            self.assertEqual(decompress(response.content), identity)
+            with CaptureQueriesContext(connection) as context:
+                cached = self.get(encoding)
+            self.assertEqual(cached.content, response.content)
+            self.assertFalse(any('FROM "assets"' in query["sql"]
+                                 for query in context.captured_queries))
+
+        self.create_asset()
+        content = brotli.decompress(self.get("br").content)
+        self.assertEqual(len(json.loads(content)), 2)
+
+
+
+def rendered_response(data):
+    """Response as DRF finalizes it, ready for CompressedPayload.store"""
+    response = Response(data)
+    response.accepted_renderer = JSONRenderer()
+    response.accepted_media_type = "application/json"
+    response.renderer_context = {}
+    return response
+
+
+class CompressedPayloadTest(AssetTestCase):
+    """
+    A changed listing is rebuilt by one request while the others wait or
+    get the previous one.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def payload(self):
+        """Payload of the brotli listing of the test community"""
+        request = Request(APIRequestFactory().get(
+            reverse("asset-list"), {"com_geo_id": self.community.geo_id,
+                                    "paginate": "false"}))
+        return CompressedPayload(request, "br")
+
+    def test_single_flight(self):
+        """Concurrent misses build the payload once"""
+        # Versions are read here, test data isn't visible to other threads
+        payloads = [self.payload() for _ in range(8)]
+        barrier = threading.Barrier(len(payloads))
+        builds, contents = [], []
+
+        def request(payload):
+            barrier.wait()
+            response = payload.cached_response()
+            if response is None:
+                builds.append(payload)
+                # Let the others miss too
+                time.sleep(0.2)
+                response = rendered_response(["built"])
+                payload.store(response)
+            contents.append(response.content)
+
+        threads = [threading.Thread(target=request, args=(payload,))
+                   for payload in payloads]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(builds), 1)
+        self.assertEqual({brotli.decompress(content) for content in contents},
+                         {b'["built"]'})
+        self.assertIsNone(cache.get(f"{payloads[0].key}:lock"))
+
+    def test_lock_held(self):
+        """Another worker's rebuild serves the previous payload, or is waited for"""
+        payload = self.payload()
+        cache.add(f"{payload.key}:lock", True)
+        cache.set(payload.key, (payload.version - 1, None, b"previous", "application/json"))
+        self.assertEqual(payload.cached_response().content, b"previous")
+
+        cache.delete(payload.key)
+        current = (payload.version, None, b"current", "application/json")
+        timer = threading.Timer(0.1, cache.set, (payload.key, current))
+        timer.start()
+        self.assertEqual(self.payload().cached_response().content, b"current")
+        timer.join()
+
+    @override_settings(ASSETS_PAYLOAD_WAIT_SECONDS=0.1)
+    def test_timeout(self):
+        """A request that waited in vain builds without taking the lock"""
+        payload = self.payload()
+        cache.add(f"{payload.key}:lock", "other")
+        self.assertIsNone(payload.cached_response())
+        payload.store(rendered_response(["built"]))
+        self.assertEqual(cache.get(f"{payload.key}:lock"), "other")
+        self.assertEqual(brotli.decompress(cache.get(payload.key)[2]), b'["built"]')
+
+
+class AssetClustersTest(AssetTestCase):
+    """
+    Asset writes keep the cluster aggregates equal to a rebuild.
+    """
+
+    @staticmethod
+    def clusters():
+        """All cluster aggregates, sums rounded off float drift"""
+        return sorted((zoom, cell, category_id, count, round(latitude_sum, 6),
+                       round(longitude_sum, 6))
+                      for zoom, cell, category_id, count, latitude_sum, longitude_sum
+                      in AssetClusters.objects.values_list(
+                          "zoom", "cell", "category_id", "count",
+                          "latitude_sum", "longitude_sum"))
+
+    def assert_rebuilt(self):
+        """Check that the incremental aggregates equal rebuilt ones"""
+        incremental = self.clusters()
+        AssetClusters.objects.rebuild()
+        self.assertEqual(incremental, self.clusters())
+        return incremental
+
+    def test_writes(self):
+        """Create, move, invalidate, validate and delete assets"""
+        other = Categories.objects.create(category="Libraries")
+        asset = self.create_asset()
+        self.create_asset(category=other, latitude=Decimal("40.20"))
+        self.assertEqual(len(self.assert_rebuilt()), 2 * len(AssetClusters.ZOOMS))
+
+        asset.latitude, asset.longitude = Decimal("40.45"), Decimal("-80.01")
+        asset.save()
+        self.assert_rebuilt()
+
+        asset.category = other
+        asset.save()
+        self.assert_rebuilt()
+
+        asset.status = 1
+        asset.save()
+        self.assertEqual(len(self.assert_rebuilt()), len(AssetClusters.ZOOMS))
+
+        asset.status = 0
+        asset.save()
+        self.assert_rebuilt()
+
+        asset.delete()
+        self.assert_rebuilt()
+        Assets.objects.all().delete()
+        self.assertEqual(self.assert_rebuilt(), [])
+
+    def test_view(self):
+        """The cluster view merges the categories of a cell"""
+        other = Categories.objects.create(category="Libraries")
+        self.create_asset(latitude=Decimal("40.19"), longitude=Decimal("-79.92"))
+        self.create_asset(category=other, latitude=Decimal("40.19"),
+                          longitude=Decimal("-79.93"))
+        self.create_asset(latitude=Decimal("40.19"), longitude=Decimal("-79.92"),
+                          status=1)
+
+        response = self.client.get(f"{reverse('asset-clusters')}"
+                                   f"?bbox=-80.5,39.5,-79.5,40.5&zoom=1")
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["zoom"], 3)
+        [cluster] = body["clusters"]
+        self.assertEqual(cluster["count"], 2)
+        self.assertEqual(cluster["categories"],
+                         {str(self.category.id): 1, str(other.id): 1})
+        self.assertAlmostEqual(cluster["latitude"], 40.19)
+        self.assertAlmostEqual(cluster["longitude"], -79.925)
+
+
+
+class AssetRatingSummariesTest(AssetTestCase):
+    """
+    Rating writes keep the rating summaries equal to a rebuild.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.good = RatingValues.objects.create(value="Good", weight=5)
+        cls.poor = RatingValues.objects.create(value="Poor", weight=1)
+
+    @staticmethod
+    def summaries():
+        """All rating summaries"""
+        return sorted(AssetRatingSummaries.objects.values_list(
+            "asset_id", "count", "weight_sum", "histogram", "last_rated"))
+
+    def assert_rebuilt(self):
+        """Check that the incremental summaries equal rebuilt ones"""
+        incremental = self.summaries()
+        AssetRatingSummaries.objects.rebuild()
+        self.assertEqual(incremental, self.summaries())
+        return incremental
+
+    def rate(self, asset, value):
+        """Rate an asset"""
+        return AssetRatings.objects.create(asset=asset, community=self.community,
+                                           value=value)
+
+    def test_writes(self):
+        """Create, re-save, re-point and delete ratings"""
+        asset, other = self.create_asset(), self.create_asset()
+        first = self.rate(asset, self.good)
+        moved = self.rate(asset, self.poor)
+        last = self.rate(asset, self.good)
+        [summary] = self.assert_rebuilt()
+        self.assertEqual(summary[1:4], (3, 11, {str(self.good.id): 2,
+                                                str(self.poor.id): 1}))
+
+        first.save()
+        [summary] = self.assert_rebuilt()
+        self.assertEqual(summary[4], first.timestamp)
+
+        moved.asset, moved.value = other, self.good
+        moved.save()
+        self.assertEqual(len(self.assert_rebuilt()), 2)
+
+        last.delete()
+        self.assert_rebuilt()
+        moved.delete()
+        [summary] = self.assert_rebuilt()
+        self.assertEqual(summary[:4], (asset.id, 1, 5, {str(self.good.id): 1}))
+
+    def test_expand(self):
+        """expand=ratings serves the summary of each asset"""
+        rated, unrated = self.create_asset(), self.create_asset()
+        self.rate(rated, self.good)
+        rating = self.rate(rated, self.poor)
+
+        response = self.client.get(f"{reverse('asset-list')}"
+                                   f"?paginate=false&expand=ratings")
+        ratings = {asset["id"]: asset["ratings"] for asset in response.json()}
+        self.assertEqual(ratings[rated.id]["count"], 2)
+        self.assertEqual(ratings[rated.id]["score"], 3)
+        self.assertEqual(ratings[rated.id]["histogram"],
+                         {str(self.good.id): 1, str(self.poor.id): 1})
+        self.assertEqual(ratings[rated.id]["last_rated"],
+                         rating.timestamp.isoformat().replace("+00:00", "Z"))
+        self.assertEqual(ratings[unrated.id], {"count": 0, "score": None,
+                                               "histogram": {}, "last_rated": None})
+
+
+
+class AssetSyncTest(AssetTestCase):
+    """
+    Syncs send the assets changed since a watermark and tombstones of the
+    ones to remove.
+    """
+
+    def sync(self, community_geo_id, changed_since=None):
+        """
+        Request a sync.
+
+        Parameters:
+            community_geo_id(int): Community geo ID.
+            changed_since(string): Watermark of a previous sync.
+        Returns:
+            upserts(list): IDs of the assets to upsert.
+            tombstones(list): IDs of the assets to remove.
+            watermark(string): Watermark of the sync.
+        """
+        query = {"com_geo_id": community_geo_id}
+        if changed_since is not None:
+            query["changed_since"] = changed_since
+        response = self.client.get(reverse("asset-sync"), query)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        return ([asset["id"] for asset in body["upserts"]], body["tombstones"],
+                body["watermark"])
+
+    def test_invalidated(self):
+        """An asset that is no longer valid is a tombstone"""
+        asset = self.create_asset()
+        upserts, tombstones, watermark = self.sync(self.community.geo_id)
+        self.assertEqual((upserts, tombstones), ([asset.id], []))
+
+        asset.status = 1
+        asset.save()
+        self.assertEqual(self.sync(self.community.geo_id, watermark)[:2],
+                         ([], [asset.id]))
+
+    def test_moved(self):
+        """An asset moved out is a tombstone of its previous community"""
+        other = Communities.objects.create(geo_id=4250409, name="Charleroi",
+                                           latitude=Decimal("40.14"),
+                                           longitude=Decimal("-79.90"))
+        asset = self.create_asset()
+        watermark = self.sync(self.community.geo_id)[2]
+
+        asset.community, asset.community_geo_id = other, other.geo_id
+        asset.save()
+        self.assertEqual(self.sync(self.community.geo_id, watermark)[:2],
+                         ([], [asset.id]))
+        self.assertEqual(self.sync(other.geo_id, watermark)[:2], ([asset.id], []))
+
+        asset.community, asset.community_geo_id = self.community, self.community.geo_id
+        asset.save()
+        self.assertEqual(self.sync(self.community.geo_id, watermark)[:2],
+                         ([asset.id], []))
+        self.assertEqual(self.sync(other.geo_id, watermark)[:2], ([], [asset.id]))
+
+    @override_settings(ASSETS_SYNC_OVERLAP_SECONDS=0)
+    def test_watermark(self):
+        """Changes at the watermark are sent, earlier ones are not"""
+        watermark = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+        before = watermark - datetime.timedelta(microseconds=1)
+        at, earlier = self.create_asset(), self.create_asset()
+        Assets.objects.filter(pk=at.pk).update(timestamp=watermark)
+        Assets.objects.filter(pk=earlier.pk).update(timestamp=before)
+        for asset_id, timestamp in ((-1, watermark), (-2, before)):
+            tombstone = AssetTombstones.objects.create(
+                asset_id=asset_id, community_geo_id=self.community.geo_id)
+            AssetTombstones.objects.filter(pk=tombstone.pk).update(timestamp=timestamp)
+
+        self.assertEqual(self.sync(self.community.geo_id, watermark.isoformat())[:2],
+                         ([at.id], [-1]))
+
+
+
+class AssetModerationTest(AssetTestCase):
+    """
+    Planners moderate the asset updates of their own community.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other = Communities.objects.create(geo_id=4250409, name="Charleroi",
+                                               latitude=Decimal("40.14"),
+                                               longitude=Decimal("-79.90"))
+
+    def authorization(self, profile_type):
+        """Authorization header of a new user of the test community"""
+        user = Users.objects.create(email=f"{profile_type}@example.com")
+        Profiles.objects.create(user=user, community=self.community, type=profile_type)
+        user = Users.objects.select_related("profiles__community").get(pk=user.pk)
+        return f"Bearer {ProfileRefreshToken.for_user(user).access_token}"
+
+    def propose(self, asset, status=1, **fields):
+        """Create an update of an asset, under review by default"""
+        values = {"name": asset.name, "community": asset.community,
+                  "category": asset.category, "latitude": asset.latitude,
+                  "longitude": asset.longitude, "type": 0}
+        values.update(fields)
+        return AssetUpdates.objects.create(asset=asset, status=status, **values)
+
+    def moderate(self, authorization, accept=(), reject=()):
+        """Post moderation decisions"""
+        return self.client.post(reverse("asset-moderation"),
+                                {"accept": list(accept), "reject": list(reject)},
+                                content_type="application/json",
+                                HTTP_AUTHORIZATION=authorization)
+
+    def test_moderate(self):
+        """Updates are accepted, rejected or skipped"""
+        planner = self.authorization(Profiles.PLANNER_TYPE)
+        asset, removed = self.create_asset(), self.create_asset()
+        foreign = self.create_asset(community=self.other,
+                                    community_geo_id=self.other.geo_id)
+        renamed = self.propose(asset, name="Renamed")
+        deleted = self.propose(removed, type=1)
+        declined = self.propose(asset, name="Declined")
+        outside = self.propose(foreign, name="Outside")
+        moderated = self.propose(asset, status=3, name="Moderated")
+
+        response = self.client.get(reverse("asset-moderation"),
+                                   HTTP_AUTHORIZATION=planner)
+        self.assertEqual([update["id"] for update in response.json()["results"]],
+                         [renamed.id, deleted.id, declined.id])
+
+        response = self.moderate(planner,
+                                 accept=[renamed.id, deleted.id, outside.id, moderated.id],
+                                 reject=[declined.id])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"accepted": [renamed.id, deleted.id],
+                                           "rejected": [declined.id],
+                                           "skipped": [outside.id, moderated.id]})
+        asset.refresh_from_db()
+        removed.refresh_from_db()
+        foreign.refresh_from_db()
+        self.assertEqual((asset.name, removed.status, foreign.name),
+                         ("Renamed", 1, "Asset"))
+        statuses = dict(AssetUpdates.objects.values_list("id", "status"))
+        self.assertEqual([statuses[update.id] for update in
+                          (renamed, deleted, declined, outside, moderated)],
+                         [2, 2, 3, 1, 3])
+
+    def test_permissions(self):
+        """Citizens and other communities are refused"""
+        citizen = self.authorization(Profiles.CITIZEN_TYPE)
+        update = self.propose(self.create_asset())
+        self.assertEqual(self.moderate(citizen, accept=[update.id]).status_code, 403)
+        self.assertEqual(self.client.get(reverse("asset-moderation"),
+                                         HTTP_AUTHORIZATION=citizen).status_code, 403)
+        self.assertEqual(self.moderate("", accept=[update.id]).status_code, 401)
+
+        planner = self.authorization(Profiles.PLANNER_TYPE)
+        response = self.client.get(f"{reverse('asset-moderation')}"
+                                   f"?com_geo_id={self.other.geo_id}",
+                                   HTTP_AUTHORIZATION=planner)
+        self.assertEqual(response.status_code, 403)
+        update.refresh_from_db()
+        self.assertEqual(update.status, 1)
+
+
+
+class SnapshotTest(AssetTestCase):
+    """
+    A snapshot rendered before a change never replaces a newer one.
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.enterContext(override_settings(ASSETS_SNAPSHOT_DIR=directory.name))
+        self.path = snapshots.snapshot_paths(self.community.geo_id)[0]
+
+    def snapshot(self):
+        """IDs of the assets in the snapshot on disk"""
+        with open(self.path, "rb") as file:
+            return [asset["id"] for asset in json.load(file)]
+
+    def test_stale_render(self):
+        """A publisher finishing after a newer one skips its snapshot"""
+        first = self.create_asset()
+        self.assertTrue(snapshots.publish_snapshot(self.community.geo_id))
+        self.assertEqual(self.snapshot(), [first.id])
+
+        render = snapshots.render_snapshot
+        newer = []
+
+        def overtaken(community_geo_id):
+            content = render(community_geo_id)
+            # Another publisher renders and writes a later version meanwhile
+            newer.append(self.create_asset())
+            with mock.patch.object(snapshots, "render_snapshot", render):
+                self.assertTrue(snapshots.publish_snapshot(community_geo_id))
+            return content
+
+        with mock.patch.object(snapshots, "render_snapshot", overtaken):
+            self.assertFalse(snapshots.publish_snapshot(self.community.geo_id))
+        self.assertEqual(self.snapshot(), [first.id, newer[0].id])
+        self.assertTrue(os.path.exists(f"{self.path}.gz"))
+
+
+class BenchmarkSerializersTest(SimpleTestCase):
+    """
+    The serializer benchmark runs and both serializers agree.
+    """
+
+    def test_small_run(self):
+        """A small run reports identical output"""
+        stdout = StringIO()
+        call_command("benchmark_serializers", sizes=[10], repeat=1, stdout=stdout)
+        self.assertTrue(stdout.getvalue().splitlines()[-1].endswith("True"))
@@ -5,10 +5,24 @@ Author: Shashank Shekhar
 """
 # from django.contrib import admin
 # from rest_framework import routers
+from django.conf import settings
 from django.urls import path
-from assets import views
+from assets import async_views, views
+
+# Async views are only worth their overhead under ASGI
+AssetsView = async_views.AsyncAssetsView if settings.SERVER_MODE == "asgi" \
+    else views.AssetsView
 
 APP_NAME = "assets"
 urlpatterns = [
-    path("get_assets", views.AssetsView.as_view(), name="asset-list"),
+    path("get_assets", AssetsView.as_view(), name="asset-list"),
+    path("clusters", views.AssetClustersView.as_view(), name="asset-clusters"),
+    path("search", views.AssetSearchView.as_view(), name="asset-search"),
+    path("autocomplete", views.AssetAutocompleteView.as_view(),
+         name="asset-autocomplete"),
+    path("facets", views.AssetFacetsView.as_view(), name="asset-facets"),
+    path("sync", views.AssetSyncView.as_view(), name="asset-sync"),
+    path("moderation", views.AssetModerationView.as_view(),
+         name="asset-moderation"),
+    path("batch", views.AssetBatchView.as_view(), name="asset-batch"),
 ]
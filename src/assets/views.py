@@ -4,47 +4,367 @@ This module maps the routes of API paths to respective views.
 Author: Shashank Shekhar
 """
 
+import datetime
+import hashlib
+import math
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_headers
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
 from rest_framework.response import Response
 
 # from rest_framework.decorators import api_view
 from rest_framework import status
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 
-from .models import Assets
-from .serializer import AssetSerializer
+from .autocomplete import prefix_indexes
+from .batch import apply_batch
+from .compression import CompressedPayload, negotiate_encoding
+from .facets import cached_facets
+from .geo import COARSE_GEO_CELL_ZOOM, BoundingBox, bbox_contains, bbox_filter, \
+    coordinates_filter, distance_m, geo_cell, indexed_bbox_filter, radius_bbox
+from .models import AssetClusters, AssetTombstones, AssetUpdates, Assets, \
+    CommunityVersions
+from .moderation import UNDER_REVIEW, moderate
+from .pagination import AssetCursorPagination, AssetSearchPagination, \
+    AssetUpdateCursorPagination
+from .permissions import IsPlanner
+from .renderers import ColumnarJSONRenderer, GeoJSONRenderer, MessagePackRenderer
+from .search import search_assets
+from .serializer import AssetSerializer, AssetUpdateSerializer, BatchSerializer, \
+    ColumnarAssetSerializer, FastAssetSerializer, GeoJSONAssetSerializer, \
+    ModerationSerializer
+from .streaming import streaming_json_response
 
 # from drf_yasg.utils import swagger_auto_schema
 
 
+def assets_etag(request):
+    """
+    Weak ETag of a get_assets response.
+
+    Derived from the data version of the requested community and the
+    request variant, so it is computed without reading any asset.
+
+    Parameters:
+        request(HttpRequest): User requests.
+    Returns:
+        etag(string): ETag, or None if the community is invalid.
+    """
+    community_geo_id = etag_community(request)
+    if community_geo_id is None:
+        return None
+    return version_etag(request, CommunityVersions.objects.current(community_geo_id))
+
+
+def etag_community(request):
+    """Community whose data version a get_assets ETag derives from"""
+    try:
+        return int(request.query_params.get('com_geo_id',
+                                            CommunityVersions.ALL_COMMUNITIES))
+    except ValueError:
+        return None
+
+
+def version_etag(request, version):
+    """
+    Weak ETag of a get_assets request variant at a data version.
+
+    Parameters:
+        request(HttpRequest): User requests.
+        version(int): Data version of the requested community.
+    Returns:
+        etag(string): ETag.
+    """
+    variant = f"{version}|{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}"
+    return f'W/"{hashlib.sha1(variant.encode()).hexdigest()}"'
+
+
+def parse_numbers(request, name, count):
+    """
+    Parse a query parameter of comma separated numbers.
+
+    Parameters:
+        request(HttpRequest): User requests.
+        name(string): Query parameter.
+        count(int): Expected number of values.
+    Returns:
+        values(list): Floats.
+    """
+    try:
+        values = [float(value) for value in request.query_params[name].split(",")]
+    except KeyError:
+        raise ValidationError({name: "This parameter is required."}) from None
+    except ValueError:
+        values = []
+    if len(values) != count or not all(math.isfinite(value) for value in values):
+        raise ValidationError({name: f"Expected {count} comma separated numbers."})
+    return values
+
+
+def parse_integer(request, name):
+    """
+    Parse an optional integer query parameter.
+
+    Parameters:
+        request(HttpRequest): User requests.
+        name(string): Query parameter.
+    Returns:
+        value(int): Integer, or None if not given.
+    """
+    if name not in request.query_params:
+        return None
+    try:
+        return int(request.query_params[name])
+    except ValueError:
+        raise ValidationError({name: "Expected an integer."}) from None
+
+
+def parse_expand(request, serializer_class):
+    """
+    Parse the expand= query parameter of comma separated expansions.
+
+    Parameters:
+        request(HttpRequest): User requests.
+        serializer_class(class): Serializer offering the expansions.
+    Returns:
+        expand(tuple): Names of the expansions to embed.
+    """
+    expand = tuple(dict.fromkeys(
+        name for name in request.query_params.get('expand', '').split(",") if name))
+    unknown = [name for name in expand if name not in serializer_class.expansions]
+    if unknown:
+        raise ValidationError(
+            {'expand': f"Unknown expansions {', '.join(unknown)}, expected "
+                       f"{', '.join(serializer_class.expansions)}."})
+    return expand
+
+
+def parse_fields(request, serializer_class):
+    """
+    Parse the fields= query parameter of comma separated asset fields.
+
+    Parameters:
+        request(HttpRequest): User requests.
+        serializer_class(class): Serializer of the fields.
+    Returns:
+        fields(tuple): Requested fields, None for all of them.
+    """
+    if 'fields' not in request.query_params:
+        return None
+    fields = tuple(name for name in request.query_params['fields'].split(",") if name)
+    unknown = [name for name in fields if name not in serializer_class.fields]
+    if unknown:
+        raise ValidationError({'fields': f"Unknown fields {', '.join(unknown)}."})
+    return fields
+
+
+def payload_encoding(request):
+    """
+    Encoding of a whole community listing to compress and cache.
+
+    Parameters:
+        request(HttpRequest): User requests with paginate=false.
+    Returns:
+        encoding(string): Negotiated encoding, None if not cached.
+    """
+    if 'com_geo_id' not in request.query_params:
+        return None
+    return negotiate_encoding(request)
+
+
+def check_coordinates(name, latitude, longitude):
+    """Validate a coordinate pair of a query parameter"""
+    if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        raise ValidationError({name: "Coordinates out of range."})
+
+
+def parse_bbox(request):
+    """
+    Parse the bbox=minLng,minLat,maxLng,maxLat query parameter.
+
+    Parameters:
+        request(HttpRequest): User requests.
+    Returns:
+        bbox(BoundingBox): Bounding box.
+    """
+    bbox = BoundingBox(*parse_numbers(request, 'bbox', 4))
+    check_coordinates('bbox', bbox.min_lat, bbox.min_lng)
+    check_coordinates('bbox', bbox.max_lat, bbox.max_lng)
+    if bbox.min_lat > bbox.max_lat:
+        raise ValidationError({'bbox': "minLat is greater than maxLat."})
+    return bbox
+
+
+def filter_assets(request):
+    """
+    Valid assets matching the filters of a request.
+
+    Query parameters:
+        com_geo_id: Community geo ID.
+        bbox: minLng,minLat,maxLng,maxLat - crosses the antimeridian if
+            minLng > maxLng.
+        near, radius_m: lat,lng and radius in meters around it.
+
+    Parameters:
+        request(HttpRequest): User requests.
+    Returns:
+        data(QuerySet): Filtered assets.
+    """
+    params = request.query_params
+    data = Assets.objects.all().filter(status__exact=0)
+    if 'com_geo_id' in params:
+        community_geo_id = params['com_geo_id']
+        data = data.filter(community_geo_id__exact=community_geo_id)
+
+    if 'bbox' in params or 'near' in params:
+        # Match the assets_valid_geo_cell_idx and assets_valid_coarse_cell_idx
+        # expressions, only the one filtered on is computed
+        data = data.alias(geo_cell=geo_cell(),
+                          coarse_geo_cell=geo_cell(COARSE_GEO_CELL_ZOOM))
+
+    if 'bbox' in params:
+        bbox = parse_bbox(request)
+        data = data.filter(indexed_bbox_filter(bbox, settings.ASSETS_MAX_CELL_RANGES),
+                           coordinates_filter(bbox))
+
+    if 'near' in params:
+        latitude, longitude = parse_numbers(request, 'near', 2)
+        check_coordinates('near', latitude, longitude)
+        radius_m = parse_numbers(request, 'radius_m', 1)[0]
+        if not 0 < radius_m <= settings.ASSETS_MAX_RADIUS_M:
+            raise ValidationError(
+                {'radius_m': f"Expected a radius up to {settings.ASSETS_MAX_RADIUS_M} m."})
+        bbox = radius_bbox(latitude, longitude, radius_m)
+        data = data.alias(distance_m=distance_m(latitude, longitude)) \
+            .filter(indexed_bbox_filter(bbox, settings.ASSETS_MAX_CELL_RANGES),
+                    coordinates_filter(bbox),
+                    distance_m__lte=radius_m)
+    return data
+
+
 class AssetsView(APIView):
     """
     Defines different asset views.
 
+    Attributes:
+        serializer_classes (dict): Serializer of get by renderer format,
+            FastAssetSerializer for others.
+        payload (CompressedPayload): Payload to build from the response,
+            if any.
+
     Methods:
         get(request): Defines the GET method to get all available assets.
         post(request): Defines the POST method to create a new asset.
     """
+    pagination_class = AssetCursorPagination
+    renderer_classes = [JSONRenderer, GeoJSONRenderer, ColumnarJSONRenderer,
+                        MessagePackRenderer, BrowsableAPIRenderer]
+    serializer_classes = {
+        GeoJSONRenderer.format: GeoJSONAssetSerializer,
+        ColumnarJSONRenderer.format: ColumnarAssetSerializer,
+        MessagePackRenderer.format: ColumnarAssetSerializer,
+    }
+    payload = None
 
-    @staticmethod
-    def get(request):
+    @method_decorator(cache_control(no_cache=True))
+    @method_decorator(vary_on_headers('Accept', 'Accept-Encoding'))
+    @method_decorator(condition(etag_func=assets_etag))
+    def get(self, request):
         """
         Get list of assets
 
-        Fetches list of all available assets
+        Fetches list of all available assets. Results are cursor paginated
+        by default; pass paginate=false to get the whole list at once, or
+        stream=true to get the whole list streamed with flat memory use.
+        Responses carry an ETag and If-None-Match is answered with 304
+        until the community's assets change. Assets can be filtered by
+        community, bounding box and radius, see filter_assets().
+
+        The format is negotiated from the Accept header or format=: JSON,
+        GeoJSON (application/geo+json), columnar JSON with lookup tables
+        (application/vnd.assetmappr.columnar+json) or columnar MessagePack
+        (application/msgpack). Streaming is JSON only.
+
+        expand=category,source,community,ratings embeds related data and
+        fields= lists the asset fields to return, besides id and
+        community_geo_id. Both are resolved in the single listing query.
+
+        Whole community listings (com_geo_id with paginate=false) are
+        compressed with brotli or gzip, as negotiated from Accept-Encoding,
+        and the compressed bytes are cached until the community changes.
+        Only one request rebuilds a changed listing, others get the
+        previous one meanwhile.
 
         Parameters:
             request(HttpRequest): User requests.
         Returns:
             response(HttpResponse): Reponse.
         """
-        data = Assets.objects.all().filter(status__exact=0)
-        if 'com_geo_id' in request.query_params:
-            community_geo_id = request.query_params['com_geo_id']
-            data = data.filter(community_geo_id__exact=community_geo_id)
+        serializer_class, options, rows = self.listing(request)
+
+        if request.query_params.get('stream') == 'true' \
+                and serializer_class is FastAssetSerializer:
+            serializer = serializer_class(**options)
+            return streaming_json_response(rows,
+                                           serializer.to_representation,
+                                           settings.ASSETS_STREAM_CHUNK_SIZE)
+
+        if request.query_params.get('paginate') == 'false':
+            encoding = payload_encoding(request)
+            if encoding:
+                payload = CompressedPayload(request, encoding)
+                response = payload.cached_response() if payload.key else None
+                if response is not None:
+                    return response
+                self.payload = payload if payload.key else None
+
+            serializer = serializer_class(rows, many=True, **options)
+            return Response(serializer.data, status=status.HTTP_200_OK)
 
-        serializer = AssetSerializer(data, context={"request": request}, many=True)
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(rows, request, view=self)
+        serializer = serializer_class(page, many=True, **options)
 
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return paginator.get_paginated_response(serializer.data)
+
+    def listing(self, request):
+        """
+        Rows of the assets a request lists, and how to serialize them.
+
+        Parameters:
+            request(HttpRequest): User requests.
+        Returns:
+            serializer_class(class): Serializer of the negotiated format.
+            options(dict): Serializer options.
+            rows(QuerySet): Rows to serialize.
+        """
+        serializer_class = self.serializer_classes.get(
+            request.accepted_renderer.format, FastAssetSerializer)
+        options = {"expand": parse_expand(request, serializer_class),
+                   "fields": parse_fields(request, serializer_class)}
+        return serializer_class, options, \
+            serializer_class.rows(filter_assets(request), **options)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """Compress and cache the payload of a whole community listing"""
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.payload is not None:
+            self.payload.store(response)
+        return response
+
+    def handle_exception(self, exc):
+        """Let other requests rebuild a payload this one failed to"""
+        if self.payload is not None:
+            self.payload.land()
+        return super().handle_exception(exc)
 
     @staticmethod
     def post(request):
@@ -66,6 +386,429 @@ class AssetsView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+def merge_clusters(rows, bbox):
+    """
+    Merge the per category aggregates of each cell into clusters.
+
+    Parameters:
+        rows(iterable): (cell, category_id, count, latitude_sum,
+            longitude_sum) aggregates.
+        bbox(BoundingBox): Viewport.
+    Returns:
+        clusters(list): Clusters centered in the viewport.
+    """
+    cells = {}
+    for cell, category_id, count, latitude_sum, longitude_sum in rows:
+        cluster = cells.setdefault(cell, {"cell": cell,
+                                          "count": 0,
+                                          "latitude": 0.0,
+                                          "longitude": 0.0,
+                                          "categories": {}})
+        cluster["count"] += count
+        cluster["latitude"] += latitude_sum
+        cluster["longitude"] += longitude_sum
+        cluster["categories"][category_id] = count
+
+    clusters = []
+    for cluster in cells.values():
+        cluster["latitude"] /= cluster["count"]
+        cluster["longitude"] /= cluster["count"]
+        # Cells around the viewport edges may have their assets outside
+        if bbox_contains(bbox, cluster["latitude"], cluster["longitude"]):
+            clusters.append(cluster)
+    return clusters
+
+
+class AssetClustersView(APIView):
+    """
+    Defines asset cluster views.
+
+    Attributes:
+        zoom_offset (int): Grid zoom levels above the map zoom level. Each
+            map tile is split into 2 ** zoom_offset by 2 ** zoom_offset cells.
+
+    Methods:
+        get(request): Defines the GET method to get clusters in a viewport.
+    """
+    zoom_offset = 2
+
+    @method_decorator(cache_control(no_cache=True))
+    @method_decorator(condition(etag_func=assets_etag))
+    def get(self, request):
+        """
+        Get asset clusters
+
+        Fetches the valid asset clusters of a viewport from the precomputed
+        per zoom level aggregates, for map zoom levels too low to draw every
+        asset.
+
+        Query parameters:
+            bbox: minLng,minLat,maxLng,maxLat of the viewport.
+            zoom: Map zoom level.
+
+        Parameters:
+            request(HttpRequest): User requests.
+        Returns:
+            response(HttpResponse): Reponse.
+        """
+        bbox = parse_bbox(request)
+        try:
+            zoom = int(request.query_params.get('zoom', ''))
+        except ValueError:
+            raise ValidationError({'zoom': "Expected an integer zoom level."}) from None
+        grid_zoom = min(max(zoom + self.zoom_offset, AssetClusters.ZOOMS[0]),
+                        AssetClusters.ZOOMS[-1])
+
+        rows = AssetClusters.objects.filter(zoom=grid_zoom) \
+            .filter(bbox_filter(bbox, field='cell', zoom=grid_zoom,
+                                max_ranges=settings.ASSETS_MAX_CELL_RANGES)) \
+            .values_list('cell', 'category_id', 'count', 'latitude_sum',
+                         'longitude_sum')
+        return Response({"zoom": grid_zoom, "clusters": merge_clusters(rows, bbox)},
+                        status=status.HTTP_200_OK)
+
+
+class AssetSearchView(APIView):
+    """
+    Defines asset search views.
+
+    Methods:
+        get(request): Defines the GET method to search assets.
+    """
+    pagination_class = AssetSearchPagination
+
+    @method_decorator(cache_control(no_cache=True))
+    @method_decorator(condition(etag_func=assets_etag))
+    def get(self, request):
+        """
+        Search assets
+
+        Full-text search of valid assets by name, address and description,
+        most relevant first. Results are page number paginated.
+
+        Query parameters:
+            q: Search query - words, "quoted phrases", or and -excluded words.
+            com_geo_id: Community geo ID.
+            category: Category ID.
+            page, page_size: Page number and size.
+
+        Parameters:
+            request(HttpRequest): User requests.
+        Returns:
+            response(HttpResponse): Reponse.
+        """
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            raise ValidationError({'q': "This parameter is required."})
+
+        data = Assets.objects.all().filter(status__exact=0)
+        community_geo_id = parse_integer(request, 'com_geo_id')
+        if community_geo_id is not None:
+            data = data.filter(community_geo_id__exact=community_geo_id)
+        category_id = parse_integer(request, 'category')
+        if category_id is not None:
+            data = data.filter(category_id__exact=category_id)
+
+        rows = FastAssetSerializer.rows(search_assets(data, text))
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(rows, request, view=self)
+        serializer = FastAssetSerializer(page, many=True)
+
+        return paginator.get_paginated_response(serializer.data)
+
+
+class AssetAutocompleteView(APIView):
+    """
+    Defines asset autocomplete views.
+
+    Methods:
+        get(request): Defines the GET method to complete typed asset names.
+    """
+
+    @method_decorator(cache_control(no_cache=True))
+    @method_decorator(condition(etag_func=assets_etag))
+    def get(self, request):
+        """
+        Autocomplete assets
+
+        Fetches the valid assets of a community whose name or address
+        words start with the typed words, best matches first. Typed words
+        without any completion match words a few typos away instead.
+
+        Query parameters:
+            com_geo_id: Community geo ID.
+            q: Typed text.
+            limit: Maximum number of matches.
+
+        Parameters:
+            request(HttpRequest): User requests.
+        Returns:
+            response(HttpResponse): Reponse.
+        """
+        community_geo_id = parse_integer(request, 'com_geo_id')
+        if community_geo_id is None:
+            raise ValidationError({'com_geo_id': "This parameter is required."})
+        limit = parse_integer(request, 'limit')
+        if limit is None:
+            limit = settings.ASSETS_AUTOCOMPLETE_LIMIT
+        if not 0 < limit <= settings.ASSETS_AUTOCOMPLETE_MAX_LIMIT:
+            raise ValidationError(
+                {'limit': f"Expected a limit up to {settings.ASSETS_AUTOCOMPLETE_MAX_LIMIT}."})
+
+        matches = prefix_indexes.get(community_geo_id) \
+            .search(request.query_params.get('q', ''), limit)
+        return Response({"results": [{"id": asset_id, "name": name, "address": address}
+                                     for asset_id, name, address in matches]},
+                        status=status.HTTP_200_OK)
+
+
+class AssetFacetsView(APIView):
+    """
+    Defines asset facet views.
+
+    Attributes:
+        max_communities (int): Maximum number of communities per request.
+
+    Methods:
+        get(request): Defines the GET method to count assets by facet.
+    """
+    max_communities = 100
+
+    @method_decorator(cache_control(no_cache=True))
+    def get(self, request):
+        """
+        Count assets by facet
+
+        Counts the assets of communities by category, source, type and
+        status. Counts are cached until the community's assets change.
+
+        Query parameters:
+            com_geo_id: Comma separated community geo IDs.
+
+        Parameters:
+            request(HttpRequest): User requests.
+        Returns:
+            response(HttpResponse): Reponse.
+        """
+        try:
+            community_geo_ids = sorted({int(value) for value in
+                                        request.query_params['com_geo_id'].split(",")})
+        except KeyError:
+            raise ValidationError({'com_geo_id': "This parameter is required."}) from None
+        except ValueError:
+            raise ValidationError({'com_geo_id': "Expected comma separated integers."}) from None
+        if len(community_geo_ids) > self.max_communities:
+            raise ValidationError(
+                {'com_geo_id': f"Expected up to {self.max_communities} communities."})
+
+        facets = cached_facets(community_geo_ids)
+        return Response({"communities": [{"com_geo_id": community_geo_id,
+                                          **facets[community_geo_id]}
+                                         for community_geo_id in community_geo_ids]},
+                        status=status.HTTP_200_OK)
+
+
+def parse_changed_since(request):
+    """
+    Parse the changed_since=ISO 8601 timestamp query parameter.
+
+    Parameters:
+        request(HttpRequest): User requests.
+    Returns:
+        changed_since(datetime): Aware timestamp, None if not given.
+    """
+    if 'changed_since' not in request.query_params:
+        return None
+    try:
+        changed_since = parse_datetime(request.query_params['changed_since'])
+    except ValueError:
+        changed_since = None
+    if changed_since is None:
+        raise ValidationError({'changed_since': "Expected an ISO 8601 timestamp."})
+    if timezone.is_naive(changed_since):
+        changed_since = timezone.make_aware(changed_since, datetime.timezone.utc)
+    return changed_since
+
+
+class AssetSyncView(APIView):
+    """
+    Defines asset sync views.
+
+    Methods:
+        get(request): Defines the GET method to get changes since a sync.
+    """
+
+    @method_decorator(cache_control(no_cache=True))
+    @method_decorator(condition(etag_func=assets_etag))
+    def get(self, request):
+        """
+        Sync assets
+
+        Fetches the assets of a community changed since a previous sync:
+        valid assets to insert or update, and IDs of assets to remove -
+        assets no longer valid, accepted for deletion or deleted. Pass the
+        returned watermark as changed_since of the next sync. Changes
+        around the watermark may be sent twice, applying them is
+        idempotent.
+
+        Query parameters:
+            com_geo_id: Community geo ID.
+            changed_since: Watermark of the previous sync, omitted for a
+                first full sync.
+
+        Parameters:
+            request(HttpRequest): User requests.
+        Returns:
+            response(HttpResponse): Reponse.
+        """
+        community_geo_id = parse_integer(request, 'com_geo_id')
+        if community_geo_id is None:
+            raise ValidationError({'com_geo_id': "This parameter is required."})
+        changed_since = parse_changed_since(request)
+        # Taken first, later writes are picked up by the next sync
+        watermark = timezone.now()
+
+        changed = Assets.objects.filter(community_geo_id__exact=community_geo_id)
+        deleted = AssetUpdates.objects.filter(asset__community_geo_id=community_geo_id,
+                                              type=1, status=2)
+        if changed_since is None:
+            # A first sync has nothing to remove
+            tombstones = set()
+            hidden = set(deleted.values_list('asset_id', flat=True))
+        else:
+            since = changed_since - datetime.timedelta(
+                seconds=settings.ASSETS_SYNC_OVERLAP_SECONDS)
+            changed = changed.filter(timestamp__gte=since)
+            tombstones = set(changed.exclude(status=0).values_list('id', flat=True))
+            hidden = set(deleted.filter(timestamp__gte=since)
+                         .values_list('asset_id', flat=True))
+            tombstones.update(hidden)
+            # Deleted assets and assets moved to other communities
+            tombstones.update(AssetTombstones.objects.filter(
+                community_geo_id=community_geo_id, timestamp__gte=since)
+                .values_list('asset_id', flat=True))
+
+        rows = list(FastAssetSerializer.rows(changed.filter(status=0)
+                                             .exclude(id__in=hidden)))
+        # Assets moved out and back are upserted
+        tombstones.difference_update(row.id for row in rows)
+        serializer = FastAssetSerializer(rows, many=True)
+
+        return Response({"watermark": watermark.isoformat().replace("+00:00", "Z"),
+                         "upserts": serializer.data,
+                         "tombstones": sorted(tombstones)},
+                        status=status.HTTP_200_OK)
+
+
+class AssetModerationView(APIView):
+    """
+    Defines asset update moderation views.
+
+    Methods:
+        get(request): Defines the GET method to list updates under review.
+        post(request): Defines the POST method to accept and reject updates.
+    """
+    pagination_class = AssetUpdateCursorPagination
+    permission_classes = [IsPlanner]
+
+    def get(self, request):
+        """
+        Get updates under review
+
+        Fetches the asset updates of the moderator's community that are
+        under review, oldest first. Results are cursor paginated. Planners
+        only.
+
+        Query parameters:
+            com_geo_id: Community geo ID, the moderator's own if omitted.
+
+        Parameters:
+            request(HttpRequest): User requests.
+        Returns:
+            response(HttpResponse): Reponse.
+        """
+        community_geo_id = parse_integer(request, 'com_geo_id')
+        if community_geo_id is None:
+            community_geo_id = request.user.community_geo_id
+        elif community_geo_id != request.user.community_geo_id:
+            raise PermissionDenied("Planners moderate their own community only.")
+        data = AssetUpdates.objects.filter(status=UNDER_REVIEW,
+                                           asset__community_geo_id=community_geo_id)
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(data, request, view=self)
+        serializer = AssetUpdateSerializer(page, many=True)
+
+        return paginator.get_paginated_response(serializer.data)
+
+    @staticmethod
+    def post(request):
+        """
+        Moderate updates
+
+        Accepts and rejects updates under review in one transaction.
+        Accepted updates are applied to their assets - Modify updates
+        replace the asset's fields and Delete updates mark it missing.
+        Updates already moderated, or of assets outside the moderator's
+        community, are skipped. Planners only.
+
+        Body:
+            accept: IDs of the updates to accept.
+            reject: IDs of the updates to reject.
+
+        Parameters:
+            request(HttpRequest): User requests.
+        Returns:
+            response(HttpResponse): Reponse.
+        """
+        serializer = ModerationSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        result = moderate(serializer.validated_data["accept"],
+                          serializer.validated_data["reject"],
+                          request.user.community_geo_id)
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class AssetBatchView(APIView):
+    """
+    Defines asset batch views.
+
+    Methods:
+        post(request): Defines the POST method to write a batch of items.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @staticmethod
+    def post(request):
+        """
+        Write a batch
+
+        Writes asset suggestions, asset updates and ratings collected
+        offline in one request and one transaction. Invalid items are
+        reported and skipped, the others are written, as the
+        authenticated user.
+
+        Body:
+            items: List of {"kind": "asset" | "update" | "rating",
+                "data": {...}}. Updates and ratings reference an existing
+                asset by asset_id, or one suggested earlier in the batch
+                by asset_ref, its item index.
+
+        Parameters:
+            request(HttpRequest): User requests.
+        Returns:
+            response(HttpResponse): Reponse with the result of each item.
+        """
+        serializer = BatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        results = apply_batch(serializer.validated_data["items"], request.user.id)
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
 # @api_view(['GET', 'POST'])
 # def asset_list(request):
 #     if request.method == 'GET':
@@ -12,5 +12,15 @@ python manage.py migrate --no-input
 # Collect static files
 python manage.py collectstatic --no-input
 
-# Run gunicorn web server
-gunicorn asset_mappr.wsgi:application --bind 0.0.0.0:8000
\ No newline at end of file
+# Publish the community listings nginx serves, if enabled
+if [ -n "$ASSETS_SNAPSHOT_DIR" ]; then
+    python manage.py publish_asset_snapshots
+fi
+
+# Run gunicorn web server, with uvicorn workers when SERVER_MODE=asgi
+if [ "$SERVER_MODE" = "asgi" ]; then
+    gunicorn asset_mappr.asgi:application --bind 0.0.0.0:8000 \
+        --worker-class uvicorn_worker.UvicornWorker
+else
+    gunicorn asset_mappr.wsgi:application --bind 0.0.0.0:8000
+fi
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""Async user views served in ASGI mode"""
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError
+from rest_framework import status
+from rest_framework.response import Response
+
+from assets.async_views import AsyncAPIView
+from assets.communities import community_ids
+from . import hashing
+from .models import Profiles, Users
+from .serializers import UserSerializer
+from .tokens import ProfileRefreshToken
+from .views import LoginView, SignupView, create_user
+
+
+class AsyncSignupView(AsyncAPIView, SignupView):
+    """Async signup view"""
+
+    async def post(self, request):  # pylint: disable=invalid-overridden-method
+        """Signup view"""
+        serializer = UserSerializer(data=request.data)
+        if not await sync_to_async(serializer.is_valid)():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        email = serializer.validated_data["email"]
+        password = serializer.validated_data["password"]
+        community_geo_id = int(request.data["comGeoId"])
+        community_id = await community_ids.aget(community_geo_id)
+        if community_id is None:
+            return Response({"error": "Community Geo ID invalid"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        user = Users(email=email)
+        await hashing.aset_password(user, password)
+        profile = Profiles(
+            first_name=request.data["name"],
+            community_id=community_id,
+            mobile=request.data["mobile"],
+            type=request.data["type"])
+
+        try:
+            # Transactions are sync only
+            await sync_to_async(create_user)(user, profile)
+        except IntegrityError:
+            if await Users.objects.by_email(email).aexists():
+                return Response(
+                    {"error": "User with this email already exists."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            community_ids.forget(community_geo_id)
+            return Response({"error": "Community Geo ID invalid"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({"userId": user.id}, status=status.HTTP_201_CREATED)
+
+    post._swagger_auto_schema = SignupView.post._swagger_auto_schema  # pylint: disable=protected-access
+
+
+class AsyncLoginView(AsyncAPIView, LoginView):
+    """Async login view"""
+
+    async def post(self, request):  # pylint: disable=invalid-overridden-method
+        """Login view"""
+        email = request.data.get("email")
+        password = request.data.get("password")
+
+        try:
+            user = await Users.objects.by_email(email) \
+                .select_related("profiles__community").aget()
+        except Users.DoesNotExist:
+            return Response({"detail": "Invalid credentials"},
+                            status=status.HTTP_401_UNAUTHORIZED)
+
+        if not await hashing.acheck_password(user, password):
+            return Response({"detail": "Invalid credentials"},
+                            status=status.HTTP_401_UNAUTHORIZED)
+
+        refresh = ProfileRefreshToken.for_user(user)
+        response_data = {
+            "access_token": str(refresh.access_token),
+            "refresh_token": str(refresh),
+            "email": email,
+            "comGeoId": refresh["comGeoId"],
+            "name": refresh["name"],
+        }
+        return Response(response_data, status=status.HTTP_200_OK)
+
+    post._swagger_auto_schema = LoginView.post._swagger_auto_schema  # pylint: disable=protected-access
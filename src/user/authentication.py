@@ -0,0 +1,92 @@
+"""Database-free JWT authentication"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.models import TokenUser
+
+
+class ProfileTokenUser(TokenUser):  # pylint: disable=abstract-method
+    """User built from the claims of a token issued by ProfileRefreshToken"""
+
+    @property
+    def community_geo_id(self):
+        """Geo ID of the user's community"""
+        return self.token.get("comGeoId")
+
+    @property
+    def name(self):
+        """User's full name"""
+        return self.token.get("name")
+
+    @property
+    def profile_type(self):
+        """Planner, citizen or default"""
+        return self.token.get("profileType")
+
+
+class VerifiedTokenCache:
+    """
+    Least recently used tokens whose signature and claims were verified.
+
+    Tokens stay cached for at most ttl seconds and never past their expiry.
+
+    Attributes:
+        size (int): Maximum number of cached tokens, 0 to cache none.
+        ttl (int): Seconds a token stays cached.
+    """
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self.tokens = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, raw_token):
+        """Verified token of a raw token, None if not cached or expired"""
+        with self.lock:
+            entry = self.tokens.get(raw_token)
+            if entry is None:
+                return None
+            token, expires_at = entry
+            if expires_at <= time.time():
+                del self.tokens[raw_token]
+                return None
+            self.tokens.move_to_end(raw_token)
+            return token
+
+    def put(self, raw_token, token):
+        """Cache a verified token"""
+        if not self.size:
+            return
+        expires_at = min(time.time() + self.ttl, token.get("exp", 0))
+        with self.lock:
+            self.tokens[raw_token] = token, expires_at
+            self.tokens.move_to_end(raw_token)
+            while len(self.tokens) > self.size:
+                self.tokens.popitem(last=False)
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    JWT authentication without any query.
+
+    The user is built from the verified token claims (TOKEN_USER_CLASS), so
+    a deleted user's tokens keep working until they expire. Verified tokens
+    are cached, a cached token is only looked up rather than verified again.
+
+    Attributes:
+        verified_tokens (VerifiedTokenCache): Tokens verified by the process.
+    """
+    verified_tokens = VerifiedTokenCache(settings.JWT_VERIFIED_TOKENS_CACHE_SIZE,
+                                         settings.JWT_VERIFIED_TOKENS_CACHE_SECONDS)
+
+    def get_validated_token(self, raw_token):
+        """Verify a raw token, unless it was verified recently"""
+        token = self.verified_tokens.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            self.verified_tokens.put(raw_token, token)
+        return token
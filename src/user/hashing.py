@@ -0,0 +1,111 @@
+"""Password hasher, and password hashing in a bounded pool of threads"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class BCryptSHA256PasswordHasher(hashers.BCryptSHA256PasswordHasher):
+    """bcrypt_sha256 at the BCRYPT_ROUNDS cost"""
+
+    @property
+    def rounds(self):
+        """bcrypt cost, hashes at another one are upgraded on login"""
+        return settings.BCRYPT_ROUNDS
+
+
+class PasswordHashingBusy(APIException):
+    """More passwords to hash than the pool may queue"""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many sign-ins at once, retry shortly."
+    default_code = "password_hashing_busy"
+    # Sent as Retry-After
+    wait = 1
+
+
+class HashingPool:
+    """
+    Threads hashing passwords, with a bounded queue.
+
+    bcrypt releases the GIL, so a few threads use as many cores while
+    request threads wait. Once every thread is busy and the queue is full,
+    hashes are refused rather than queued behind seconds of work.
+
+    Admission is per process. A sync WSGI worker serves one request at a
+    time, so its pool never fills and only bounds the hashing threads;
+    refusals take effect when a process serves many requests at once, as
+    ASGI workers do.
+    """
+
+    def __init__(self, threads, queue):
+        self.executor = ThreadPoolExecutor(threads, thread_name_prefix="bcrypt")
+        self.slots = threading.BoundedSemaphore(threads + queue)
+
+    def submit(self, function, *args):
+        """Schedule a hash, raise PasswordHashingBusy if the queue is full"""
+        if not self.slots.acquire(blocking=False):  # pylint: disable=consider-using-with
+            raise PasswordHashingBusy()
+        try:
+            future = self.executor.submit(function, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    def run(self, function, *args):
+        """Hash in the pool and wait for the result"""
+        return self.submit(function, *args).result()
+
+    async def arun(self, function, *args):
+        """Hash in the pool and await the result"""
+        return await asyncio.wrap_future(self.submit(function, *args))
+
+
+@functools.lru_cache(maxsize=None)
+def hashing_pool():
+    """Pool of this process"""
+    return HashingPool(settings.PASSWORD_HASHING_THREADS,
+                       settings.PASSWORD_HASHING_QUEUE)
+
+
+def set_password(user, raw_password):
+    """Hash a new password of a user in the pool"""
+    hashing_pool().run(user.set_password, raw_password)
+
+
+def check_password(user, raw_password):
+    """
+    Check a password in the pool.
+
+    A valid password is hashed again, in the same task, if its hasher isn't
+    the preferred one or its cost changed, and the new hash is saved.
+    """
+    encoded = user.password
+    if not hashing_pool().run(hashers.check_password, raw_password, encoded,
+                              user.set_password):
+        return False
+    if user.password != encoded:
+        user.save(update_fields=["password"])
+    return True
+
+
+async def aset_password(user, raw_password):
+    """Async set_password"""
+    await hashing_pool().arun(user.set_password, raw_password)
+
+
+async def acheck_password(user, raw_password):
+    """Async check_password"""
+    encoded = user.password
+    if not await hashing_pool().arun(hashers.check_password, raw_password, encoded,
+                                     user.set_password):
+        return False
+    if user.password != encoded:
+        await user.asave(update_fields=["password"])
+    return True
@@ -0,0 +1,60 @@
+"""Benchmark of the JWT authentication classes"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from user.authentication import StatelessJWTAuthentication, VerifiedTokenCache
+from user.models import Users
+from user.tokens import ProfileRefreshToken
+
+
+class Command(BaseCommand):
+    """
+    Authenticates the same get_assets request repeatedly with each class
+    and prints the latency per request and the queries it ran.
+    """
+    help = "Compare the latency of the JWT authentication classes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=5000,
+                            help="Requests per authentication class")
+
+    def handle(self, *args, **options):
+        user = Users.objects.select_related("profiles__community").first()
+        if user is None:
+            raise CommandError("Sign up a user first")
+        token = ProfileRefreshToken.for_user(user).access_token
+        request = Request(APIRequestFactory().get(
+            "/api/assets/get_assets", HTTP_AUTHORIZATION=f"Bearer {token}"))
+
+        uncached = StatelessJWTAuthentication()
+        uncached.verified_tokens = VerifiedTokenCache(0, 0)
+        cached = StatelessJWTAuthentication()
+        cached.verified_tokens = VerifiedTokenCache(1024, 60)
+        authenticators = [("JWTAuthentication", JWTAuthentication()),
+                          ("StatelessJWTAuthentication, no cache", uncached),
+                          ("StatelessJWTAuthentication", cached)]
+
+        self.stdout.write(f"{'class':<40}{'mean us':>9}{'p99 us':>9}"
+                          f"{'queries':>9}{'failed':>8}")
+        for name, authenticator in authenticators:
+            latencies, failed = [], 0
+            with CaptureQueriesContext(connection) as queries:
+                for _ in range(options["requests"]):
+                    start = time.perf_counter()
+                    try:
+                        authenticator.authenticate(request)
+                    except AuthenticationFailed:
+                        failed += 1
+                    latencies.append(time.perf_counter() - start)
+            latencies.sort()
+            self.stdout.write(
+                f"{name:<40}{sum(latencies) / len(latencies) * 1e6:>9.1f}"
+                f"{latencies[int(len(latencies) * 0.99)] * 1e6:>9.1f}"
+                f"{len(queries) / options['requests']:>9.2f}{failed:>8}")
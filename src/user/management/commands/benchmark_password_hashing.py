@@ -0,0 +1,111 @@
+"""Benchmark of password verification under concurrent logins"""
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from user.hashing import HashingPool, PasswordHashingBusy
+
+PASSWORD = "benchmark-password"
+
+
+class Command(BaseCommand):
+    """
+    Verifies a password hashed at each bcrypt cost from as many threads
+    as the hashing pool has, and recommends the highest BCRYPT_ROUNDS whose
+    p95 login latency meets the target on this machine.
+
+    Then verifies a password from many threads at once, as concurrent
+    logins do, directly in the request threads and through the hashing
+    pool. Nothing is written to the database.
+    """
+    help = "Pick BCRYPT_ROUNDS and measure login verification throughput"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rounds", type=int, nargs="+",
+                            default=[10, 11, 12, 13, 14],
+                            help="bcrypt costs to try")
+        parser.add_argument("--target-p95-ms", type=float, default=500,
+                            help="Most acceptable p95 login latency")
+        parser.add_argument("--logins", type=int, default=64,
+                            help="Verifications per measure")
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32],
+                            help="Logins in flight")
+
+    def handle(self, *args, **options):
+        threads = settings.PASSWORD_HASHING_THREADS
+        pool = HashingPool(threads, settings.PASSWORD_HASHING_QUEUE)
+
+        self.stdout.write(f"{threads} hashing threads, {threads} logins in flight")
+        self.stdout.write(f"{'rounds':<8}{'login/s':>9}{'p50 ms':>9}{'p95 ms':>9}")
+        chosen = None
+        for rounds in sorted(options["rounds"]):
+            with override_settings(BCRYPT_ROUNDS=rounds):
+                encoded = make_password(PASSWORD)
+            result = load(lambda password, encoded=encoded:
+                          pool.run(check_password, password, encoded),
+                          options["logins"], threads)
+            self.stdout.write(f"{rounds:<8}{result['throughput']:>9.1f}"
+                              f"{result['p50'] * 1000:>9.1f}{result['p95'] * 1000:>9.1f}")
+            if result["p95"] * 1000 <= options["target_p95_ms"]:
+                chosen = rounds
+        if chosen is None:
+            self.stdout.write(f"No cost meets a p95 of {options['target_p95_ms']:.0f} ms")
+        else:
+            self.stdout.write(f"BCRYPT_ROUNDS={chosen} meets a p95 of "
+                              f"{options['target_p95_ms']:.0f} ms")
+
+        encoded = make_password(PASSWORD)
+        modes = [("request threads", lambda password: check_password(password, encoded)),
+                 ("hashing pool", lambda password: pool.run(check_password, password,
+                                                            encoded))]
+
+        self.stdout.write(f"\nBCRYPT_ROUNDS={settings.BCRYPT_ROUNDS}, "
+                          f"queue of {settings.PASSWORD_HASHING_QUEUE}")
+        self.stdout.write(f"{'mode':<18}{'logins':>7}{'login/s':>9}{'p50 ms':>9}"
+                          f"{'p95 ms':>9}{'503':>6}")
+        for concurrency in options["concurrency"]:
+            for name, verify in modes:
+                result = load(verify, options["logins"], concurrency)
+                self.stdout.write(
+                    f"{name:<18}{concurrency:>7}{result['throughput']:>9.1f}"
+                    f"{result['p50'] * 1000:>9.1f}{result['p95'] * 1000:>9.1f}"
+                    f"{result['rejected']:>6}")
+
+
+def load(verify, count, concurrency):
+    """
+    Verify the password from concurrent threads.
+
+    Parameters:
+        verify(callable): Password check.
+        count(int): Number of verifications.
+        concurrency(int): Verifications in flight.
+    Returns:
+        result(dict): Accepted verifications per second, p50 and p95
+            latencies in seconds of accepted ones, and number rejected.
+    """
+    def login(_):
+        start = time.perf_counter()
+        try:
+            verify(PASSWORD)
+        except PasswordHashingBusy:
+            return None
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(login, range(count)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency in results if latency is not None)
+    percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 \
+        else latencies * 99
+    return {"throughput": len(latencies) / elapsed,
+            "p50": percentiles[49],
+            "p95": percentiles[94],
+            "rejected": count - len(latencies)}
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.30 on 2026-10-18 09:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('assets', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Users',
+            fields=[
+                ('last_login', models.DateTimeField(blank=True, null=True, verbose_name='last login')),
+                ('id', models.BigAutoField(primary_key=True, serialize=False, verbose_name='User ID')),
+                ('email', models.EmailField(max_length=254, unique=True, verbose_name="User's email ID")),
+                ('password', models.CharField(max_length=255, verbose_name='Password hash')),
+                ('salt', models.CharField(max_length=255, verbose_name='Salt')),
+            ],
+            options={
+                'db_table': 'users',
+            },
+        ),
+        migrations.CreateModel(
+            name='Profiles',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='user.users')),
+                ('type', models.CharField(choices=[('default', 'default'), ('planner', 'planner'), ('citizen', 'citizen')], default='default', max_length=25, verbose_name='planner or citizen')),
+                ('first_name', models.CharField(default='', max_length=255, verbose_name='First name')),
+                ('last_name', models.CharField(default='', max_length=255, verbose_name='Last name')),
+                ('mobile', models.CharField(default='', max_length=15, verbose_name='Mobile number')),
+                ('dob', models.DateField(null=True, verbose_name='Date of birth')),
+                ('ethnicity', models.CharField(max_length=100, null=True, verbose_name='Ethnicity')),
+                ('race', models.CharField(max_length=50, null=True, verbose_name='Race')),
+                ('gender', models.CharField(max_length=50, null=True, verbose_name='Gender')),
+                ('community', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='assets.communities')),
+            ],
+            options={
+                'db_table': 'user_profiles',
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:23
+
+from django.db import migrations, models
+
+# Plain bcrypt hashes embed their salt, prefixed with the algorithm they
+# are checked by BCryptPasswordHasher and upgraded on login
+PREFIX_BCRYPT = """
+UPDATE users SET password = 'bcrypt$' || password WHERE password LIKE '$2%'
+"""
+
+# The salt column held the base64 of the bcrypt salt, the first 29
+# characters of the hash
+UNPREFIX_BCRYPT = """
+UPDATE users
+SET salt = encode(convert_to(substr(password, 8, 29), 'UTF8'), 'base64'),
+    password = substr(password, 8)
+WHERE password LIKE 'bcrypt$$2%'
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(PREFIX_BCRYPT, UNPREFIX_BCRYPT),
+        # Lets the column be added back to existing rows when reverting
+        migrations.AlterField(
+            model_name='users',
+            name='salt',
+            field=models.CharField(default='', max_length=255, verbose_name='Salt'),
+        ),
+        migrations.RemoveField(
+            model_name='users',
+            name='salt',
+        ),
+    ]
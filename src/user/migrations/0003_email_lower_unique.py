@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:27
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0002_drop_salt'),
+    ]
+
+    operations = [
+        # Fails while emails differing only in case exist, merge them first
+        migrations.AddConstraint(
+            model_name='users',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='users_email_lower_uniq'),
+        ),
+    ]
@@ -1,9 +1,8 @@
 """User Manager models"""
 # models.py
-import base64
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
 from django.db import models
-import bcrypt
+from django.db.models.functions import Lower
 
 
 class UserManager(BaseUserManager):
@@ -20,6 +19,11 @@ class UserManager(BaseUserManager):
         user.save(using=self._db)
         return user
 
+    def by_email(self, email):
+        """Users with an email in any case, looked up on the unique index"""
+        return self.alias(email_lower=Lower("email")) \
+            .filter(email_lower=str(email or "").lower())
+
     def create_superuser(self, email, password=None, **extra_fields):
         """Creating superuser"""
         extra_fields.setdefault("is_staff", True)
@@ -29,37 +33,18 @@ class UserManager(BaseUserManager):
 
 
 class Users(AbstractBaseUser):
-    """User class"""
+    """User class, passwords are hashed with PASSWORD_HASHERS"""
     id = models.BigAutoField(primary_key=True,
                              verbose_name="User ID")
     email = models.EmailField(unique=True,
                               verbose_name="User's email ID")
     password = models.CharField(max_length=255, verbose_name="Password hash")
-    salt = models.CharField(max_length=255, verbose_name="Salt")
 
     objects = UserManager()
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["email"]
 
-    def set_password(self, raw_password):
-        """Password set function"""
-        salt = bcrypt.gensalt()
-        salt_str = base64.b64encode(salt).decode(
-            "ascii"
-        )  # Convert salt to ASCII string
-        hashed_password = bcrypt.hashpw(raw_password.encode(), salt)
-
-        self.password = hashed_password.decode()
-        self.salt = salt_str
-
-    def check_password(self, raw_password):
-        """Password check function"""
-        hashed_password = bcrypt.hashpw(
-            raw_password.encode(), base64.b64decode(self.salt.encode())
-        )
-        return self.password == hashed_password.decode()
-
     def __str__(self):
         """Return user email"""
         return str(self.email)
@@ -67,6 +52,10 @@ class Users(AbstractBaseUser):
     class Meta:  # pylint: disable=too-few-public-methods
         """DB table for user"""
         db_table = "users"
+        constraints = [
+            # Signups race on this, not on a lookup before inserting
+            models.UniqueConstraint(Lower("email"), name="users_email_lower_uniq"),
+        ]
 
 
 class Profiles(models.Model):
@@ -11,7 +11,9 @@ class UserSerializer(serializers.ModelSerializer):
         """User meta"""
         model = Users
         fields = ['id', 'email', 'password']
-        extra_kwargs = {'password': {'write_only': True}}
+        # Email uniqueness is left to the database, see SignupView
+        extra_kwargs = {'password': {'write_only': True},
+                        'email': {'validators': []}}
 
     def create(self, validated_data):
         """Create user"""
@@ -1,4 +1,212 @@
-"""Unimplemented test file"""
-# from django.test import TestCase
+"""Tests of signup and login"""
+import datetime
+import threading
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import bcrypt
+from django.contrib.auth.hashers import make_password
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from assets.communities import community_ids
+from assets.models import Communities
+
+from .authentication import StatelessJWTAuthentication
+from .hashing import HashingPool
+from .models import Profiles, Users
+from .tokens import ProfileRefreshToken
+
+PASSWORD = "pw123456"
+GEO_ID = 4250408
+
+
+def create_community():
+    """Community users sign up in"""
+    return Communities.objects.create(geo_id=GEO_ID,
+                                      name="Monongahela",
+                                      latitude=Decimal("40.19"),
+                                      longitude=Decimal("-79.92"))
+
+
+def signup_data(email, geo_id=GEO_ID):
+    """Signup request body"""
+    return {"email": email, "password": PASSWORD, "comGeoId": geo_id,
+            "name": "Ada", "mobile": "4125550100", "type": Profiles.CITIZEN_TYPE}
+
+
+@override_settings(BCRYPT_ROUNDS=4)
+class LoginTest(TestCase):
+    """Login verifies and upgrades password hashes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.community = create_community()
+
+    def create_user(self, password):
+        """User with a profile and the given password hash"""
+        user = Users.objects.create(email="ada@example.com", password=password)
+        Profiles.objects.create(user=user, community=self.community,
+                                first_name="Ada", last_name="Lovelace",
+                                type=Profiles.CITIZEN_TYPE)
+        return user
+
+    def login(self, password=PASSWORD):
+        """Request a login"""
+        return self.client.post(reverse("login"),
+                                {"email": "ada@example.com", "password": password},
+                                content_type="application/json")
+
+    def test_legacy_bcrypt(self):
+        """A baseline bcrypt hash logs in and is rehashed with bcrypt_sha256"""
+        legacy = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(4)).decode()
+        user = self.create_user(f"bcrypt${legacy}")
+
+        self.assertEqual(self.login("wrong").status_code, 401)
+        self.assertEqual(self.login().status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("bcrypt_sha256$"))
+        self.assertEqual(self.login().status_code, 200)
+
+    def test_claims(self):
+        """Login reads the user, profile and community in one query"""
+        user = self.create_user(make_password(PASSWORD))
+        with self.assertNumQueries(1):
+            response = self.login()
+        token = AccessToken(response.json()["access_token"])
+        self.assertEqual((token["user_id"], token["comGeoId"], token["name"],
+                          token["profileType"]),
+                         (str(user.id), GEO_ID, "Ada Lovelace", Profiles.CITIZEN_TYPE))
+
+    def test_changed_rounds(self):
+        """A hash at another cost is rehashed at BCRYPT_ROUNDS"""
+        user = self.create_user(make_password(PASSWORD))
+        self.assertIn("$04$", user.password)
+
+        with override_settings(BCRYPT_ROUNDS=5):
+            self.assertEqual(self.login().status_code, 200)
+        user.refresh_from_db()
+        self.assertIn("$05$", user.password)
+
+    def test_pool_full(self):
+        """Logins are turned away with a 503 once the pool queue is full"""
+        self.create_user(make_password(PASSWORD))
+        pool = HashingPool(1, 0)
+        release = threading.Event()
+        pool.submit(release.wait)
+        try:
+            with mock.patch("user.hashing.hashing_pool", return_value=pool):
+                response = self.login()
+        finally:
+            release.set()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+
+
+
+class StatelessAuthenticationTest(TestCase):
+    """Requests are authenticated from the token claims alone"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = Users.objects.create(email="ada@example.com")
+        Profiles.objects.create(user=user, community=create_community(),
+                                first_name="Ada", last_name="Lovelace",
+                                type=Profiles.PLANNER_TYPE)
+        cls.user = Users.objects.select_related("profiles__community").get(pk=user.pk)
+
+    def access_token(self):
+        """Access token of the test user"""
+        return ProfileRefreshToken.for_user(self.user).access_token
+
+    def batch(self, token):
+        """Post an empty batch, which needs an authenticated user"""
+        return self.client.post(reverse("asset-batch"), {"items": []},
+                                content_type="application/json",
+                                HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_claims(self):
+        """The request user is built from the claims without a query"""
+        request = APIRequestFactory().get(
+            "/", HTTP_AUTHORIZATION=f"Bearer {self.access_token()}")
+        with self.assertNumQueries(0):
+            user, _ = StatelessJWTAuthentication().authenticate(request)
+            self.assertEqual((user.id, user.community_geo_id, user.name,
+                              user.profile_type),
+                             (str(self.user.id), GEO_ID, "Ada Lovelace",
+                              Profiles.PLANNER_TYPE))
+            self.assertTrue(user.is_authenticated)
+
+    def test_invalid_tokens(self):
+        """Tampered and expired tokens are refused"""
+        self.assertEqual(self.batch(self.access_token()).status_code, 400)
+
+        header, payload, signature = str(self.access_token()).split(".")
+        tampered = f"{header}.{payload}.{signature[:-4]}AAAA"
+        self.assertEqual(self.batch(tampered).status_code, 401)
+
+        token = self.access_token()
+        token["profileType"] = Profiles.CITIZEN_TYPE
+        forged = f"{header}.{str(token).split('.')[1]}.{signature}"
+        self.assertEqual(self.batch(forged).status_code, 401)
+
+        token = self.access_token()
+        token.set_exp(lifetime=-datetime.timedelta(seconds=1))
+        self.assertEqual(self.batch(token).status_code, 401)
+
+
+@override_settings(BCRYPT_ROUNDS=4)
+class SignupTest(TestCase):
+    """Signup leaves emails to the unique index"""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_community()
+
+    def setUp(self):
+        community_ids.forget(GEO_ID)
+
+    def signup(self, email):
+        """Request a signup"""
+        return self.client.post(reverse("signup"), signup_data(email),
+                                content_type="application/json")
+
+    def test_duplicate_email(self):
+        """An email taken in another case is a conflict and writes nothing"""
+        self.assertEqual(self.signup("ada@example.com").status_code, 201)
+
+        response = self.signup("Ada@Example.com")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Users.objects.filter(email__iexact="ada@example.com").count(), 1)
+        self.assertEqual(Profiles.objects.count(), 1)
+
+    def test_login_any_case(self):
+        """A user logs in with their email in any case"""
+        self.assertEqual(self.signup("Ada@Example.com").status_code, 201)
+        response = self.client.post(reverse("login"),
+                                    {"email": "ada@example.COM", "password": PASSWORD},
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(BCRYPT_ROUNDS=4)
+class SignupCommunityTest(TransactionTestCase):
+    """
+    Signup in a community deleted since it was cached leaves no user.
+    The profile's foreign key is checked on commit, so this one commits.
+    """
+
+    def test_deleted_community(self):
+        """The user insert is rolled back with the profile"""
+        community = create_community()
+        community_ids.forget(GEO_ID)
+        self.assertEqual(community_ids.get(GEO_ID), community.id)
+        community.delete()
+
+        response = self.client.post(reverse("signup"), signup_data("ada@example.com"),
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Users.objects.exists())
+        self.assertIsNone(community_ids.get(GEO_ID))
@@ -0,0 +1,23 @@
+"""JWT tokens carrying profile claims"""
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def profile_claims(profile):
+    """Claims describing a profile, so views can read them instead of querying"""
+    return {
+        "comGeoId": profile.community.geo_id,
+        "name": f"{profile.first_name} {profile.last_name}",
+        "profileType": profile.type,
+    }
+
+
+class ProfileRefreshToken(RefreshToken):
+    """Refresh token with profile claims, copied into its access tokens"""
+
+    @classmethod
+    def for_user(cls, user):
+        """Token of a user loaded with select_related("profiles__community")"""
+        token = super().for_user(user)
+        for claim, value in profile_claims(user.profiles).items():
+            token[claim] = value
+        return token
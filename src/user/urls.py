@@ -1,13 +1,20 @@
 """Urls file"""
+from django.conf import settings
 from django.urls import path
 from rest_framework_simplejwt.views import (
     TokenRefreshView,
 )
-from . import views
+from . import async_views, views
+
+# Async views are only worth their overhead under ASGI
+if settings.SERVER_MODE == "asgi":
+    SignupView, LoginView = async_views.AsyncSignupView, async_views.AsyncLoginView
+else:
+    SignupView, LoginView = views.SignupView, views.LoginView
 
 APP_NAME = "user"
 urlpatterns = [
-    path("signup", views.SignupView.as_view(), name="signup"),
-    path("login", views.LoginView.as_view(), name="login"),
+    path("signup", SignupView.as_view(), name="signup"),
+    path("login", LoginView.as_view(), name="login"),
     path("refresh-token/", TokenRefreshView.as_view(), name="refresh_token"),
 ]
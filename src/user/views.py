@@ -1,6 +1,7 @@
 """User views"""
 # pylint: skip-file
 
+from django.db import IntegrityError, transaction
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
@@ -9,13 +10,28 @@ from drf_yasg.utils import swagger_auto_schema
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.permissions import AllowAny
 from .models import Users, Profiles
-from assets.models import Communities
+from assets.communities import community_ids
 from .serializers import UserSerializer
+from .tokens import ProfileRefreshToken
+from . import hashing
 
 
 # ...
 
 
+def create_user(user, profile):
+    """
+    Insert a user and their profile in one transaction, without reading.
+
+    A taken email, in any case, fails on the unique index and a deleted
+    community on commit, with an IntegrityError either way.
+    """
+    with transaction.atomic():
+        user.save(force_insert=True)
+        profile.user = user
+        profile.save(force_insert=True)
+
+
 class SignupView(APIView):
     """Signup view"""
 
@@ -54,43 +70,43 @@ class SignupView(APIView):
         if serializer.is_valid():
             email = serializer.validated_data["email"]
             password = serializer.validated_data["password"]
+            # Get community details from the process cache
+            community_geo_id = int(request.data["comGeoId"])
+            community_id = community_ids.get(community_geo_id)
+            if community_id is None:
+                return Response({f"error": "Community Geo ID invalid"},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+            # Create a new user instance, hashed before the transaction
+            user = Users(email=email)
+            hashing.set_password(user, password)
+
+            # Attach profile information
+            name = request.data["name"]
+            mobile = request.data["mobile"]
+            user_type = request.data["type"]
+            profile = Profiles(
+                first_name=name,
+                community_id=community_id,
+                mobile=mobile,
+                type=user_type)
+
             try:
-                # Check if user already exists
-                Users.objects.get(email=email)
-                return Response(
-                    {"error": "User with this email already exists."},
-                    status=status.HTTP_409_CONFLICT,
-                )
-            except Users.DoesNotExist:
-                try:
-                    # Get community details
-                    community_geo_id = int(request.data["comGeoId"])
-                    community = Communities.objects.get(geo_id=community_geo_id)
-                except Communities.DoesNotExist:
-                    return Response({f"error": "Community Geo ID invalid"},
-                                    status=status.HTTP_400_BAD_REQUEST)
-                
-                # Create a new user instance
-                user = Users(email=email)
-                user.set_password(password)
-                user.save()
-
-                
-                # Attach profile information
-                name = request.data["name"]
-                mobile = request.data["mobile"]
-                user_type = request.data["type"]             
-                profile = Profiles(
-                    user=user,
-                    first_name=name,
-                    community=community,
-                    mobile=mobile,
-                    type=user_type)
-                profile.save()
-
-                response_data = {"userId": user.id}
-
-                return Response(response_data, status=status.HTTP_201_CREATED)
+                create_user(user, profile)
+            except IntegrityError:
+                if Users.objects.by_email(email).exists():
+                    return Response(
+                        {"error": "User with this email already exists."},
+                        status=status.HTTP_409_CONFLICT,
+                    )
+                # The community was deleted since it was cached
+                community_ids.forget(community_geo_id)
+                return Response({f"error": "Community Geo ID invalid"},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+            response_data = {"userId": user.id}
+
+            return Response(response_data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -136,28 +152,28 @@ class LoginView(APIView):
         email = request.data.get("email")
         password = request.data.get("password")
 
-        # Retrieve the user based on the email
+        # Retrieve the user with their profile and community in one query,
+        # emails are unique in any case
         try:
-            user = Users.objects.get(email=email)
+            user = Users.objects.by_email(email) \
+                .select_related("profiles__community").get()
         except Users.DoesNotExist:
             return Response({"detail": "Invalid credentials"},
                             status=status.HTTP_401_UNAUTHORIZED)
 
-        # Verify the password
-        if user.check_password(password):
-            # Generate tokens
-            refresh = RefreshToken.for_user(user)
+        # Verify the password, upgrading its hash to the configured cost
+        if hashing.check_password(user, password):
+            # Generate tokens carrying the profile claims
+            refresh = ProfileRefreshToken.for_user(user)
             access_token = str(refresh.access_token)
             refresh_token = str(refresh)
-            name = f"{user.profiles.first_name} {user.profiles.last_name}"
-            community_id = user.profiles.community.geo_id
 
             response_data = {
                 "access_token": access_token,
                 "refresh_token": refresh_token,
                 "email": email,
-                "comGeoId": community_id,
-                "name": name
+                "comGeoId": refresh["comGeoId"],
+                "name": refresh["name"]
             }
             # Return the tokens in the response
             return Response(response_data, status=status.HTTP_200_OK)